@@ -2,158 +2,222 @@
 # aggregate_explanation_stats.py
 # 
 
+import argparse
 import csv
+import json
+import math
 import statistics
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # Directories
 INPUT_DIR   = Path("size_explanation")  
 OUTPUT_FILE = Path("aggregated_explanation_stats.csv")
+CACHE_FILE  = Path(".cache") / "aggregate_explanation_stats.json"
 
 # Metrics to aggregate 
 METRICS   = ["pct_args_of_graph", "pct_branches_returned"]
 
 # Bins: 0–10, 10–20, …, 90–100 
-BIN_EDGES  = list(range(0, 101, 10))
-BIN_LABELS = [f"bin_{low}_{low+10}" for low in BIN_EDGES[:-1]]
-
-# Storage: { (explanation_type, ranking, metric) : [values] }
-data = defaultdict(list)
-
-print("=" * 60)
-print("EXPLANATION STATISTICS AGGREGATION")
-print("=" * 60)
-print(f"Reading CSV files from: {INPUT_DIR}")
-print(f"Output will be saved to: {OUTPUT_FILE}")
-
-# Check if input directory exists
-if not INPUT_DIR.exists():
-    print(f"ERROR: Input directory '{INPUT_DIR}' not found")
-    print(f"Current working directory: {Path.cwd()}")
-    print("STOPPING EXECUTION to verify input directory path")
-    exit(1)
-
-# Count files for progress tracking
-csv_files = list(INPUT_DIR.glob("*_size_analysis.csv"))
-total_files = len(csv_files)
-
-if total_files == 0:
-    print(f"ERROR: No size analysis CSV files found in '{INPUT_DIR}'")
-    print(f"Directory contents: {list(INPUT_DIR.iterdir()) if INPUT_DIR.exists() else 'Directory does not exist'}")
-    print("STOPPING EXECUTION to verify file discovery")
-    exit(1)
-
-print(f"Found {total_files} size analysis files to process")
-print("-" * 60)
-
-# Read all CSV files 
-processed_files = 0
-for csv_file in csv_files:
+BIN_WIDTH  = 10
+BIN_EDGES  = list(range(0, 101, BIN_WIDTH))
+BIN_LABELS = [f"bin_{low}_{low+BIN_WIDTH}" for low in BIN_EDGES[:-1]]
+
+
+def parse_size_file(csv_file: Path) -> dict:
+    """Parse one size analysis CSV into { (explanation_type, ranking, metric) : [values] }.
+
+    Raises ValueError, naming the file, if it cannot be read or has corrupted rows.
+    """
+    partial = defaultdict(list)
     try:
         with csv_file.open("r", encoding="utf-8", newline="") as f:
-            # Detect delimiter 
-            sample = f.read(2048)
-            delim  = "\t" if "\t" in sample and sample.count("\t") > sample.count(",") else ","
-            f.seek(0)
-            
-            reader = csv.DictReader(f, delimiter=delim)
-            file_rows = 0
-            
+            # Detect delimiter from the header line alone, then keep reading after it
+            first_line = f.readline()
+            delim      = "\t" if first_line.count("\t") > first_line.count(",") else ","
+            header     = next(csv.reader([first_line], delimiter=delim), [])
+
+            reader = csv.reader(f, delimiter=delim)
+
+            # Resolve the needed columns once per file instead of building a dict per row
+            columns    = {name: i for i, name in enumerate(header)}
+            etype_idx  = columns.get("explanation_type")
+            rank_idx   = columns.get("ranking")
+            metric_idx = [(metric, columns.get(metric)) for metric in METRICS]
+
             for row in reader:
-                etype = row.get("explanation_type", "")
-                rank  = row.get("ranking", "")
-                
+                if not row:
+                    continue
+                etype = row[etype_idx] if etype_idx is not None and etype_idx < len(row) else ""
+                rank  = row[rank_idx]  if rank_idx  is not None and rank_idx  < len(row) else ""
+
                 # Handle ranking format variations (underscores vs spaces)
                 rank = rank.replace("_", " ") if rank else ""
-                
-                for metric in METRICS:
+
+                for metric, idx in metric_idx:
                     try:
-                        val = float(row.get(metric, ""))
-                        data[(etype, rank, metric)].append(val)
-                        file_rows += 1
-                    except (TypeError, ValueError):
-                        print(f"ERROR: Corrupted or incomplete data in file {csv_file.name} (row: {row})")
-                        print("STOPPING EXECUTION due to corrupted/incomplete file.")
-                        exit(1)
-            
-            processed_files += 1
-            
-            # Progress update every 500 files
-            if processed_files % 500 == 0:
-                print(f"Progress: {processed_files}/{total_files} files processed")
-                
+                        partial[(etype, rank, metric)].append(float(row[idx]))
+                    except (TypeError, ValueError, IndexError):
+                        raise ValueError(f"Corrupted or incomplete data (row: {row})")
     except Exception as e:
-        print(f"ERROR: Failed to process file {csv_file.name}: {e}")
-        print("STOPPING EXECUTION due to corrupted/incomplete file.")
-        exit(1)
+        # Name the file here: with chunked dispatch the driver cannot tell which file failed
+        raise ValueError(f"Failed to process file {csv_file.name}: {e}") from e
+    return dict(partial)
+
 
-print(f"✓ Successfully processed {processed_files}/{total_files} files")
-print(f"✓ Total data points collected: {sum(len(values) for values in data.values())}")
+def load_cache() -> dict:
+    """Load { path : {"mtime_ns", "size", "rows"} } from CACHE_FILE, or {} if it is missing or unreadable."""
+    try:
+        with CACHE_FILE.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache: dict):
+    """Write the per-file parse results to CACHE_FILE."""
+    CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with CACHE_FILE.open("w", encoding="utf-8") as f:
+        json.dump(cache, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate explanation size statistics")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Print one line per aggregated combination")
+    args = parser.parse_args()
+
+    # Storage: { (explanation_type, ranking, metric) : [values] }
+    data = defaultdict(list)
+
+    print("=" * 60)
+    print("EXPLANATION STATISTICS AGGREGATION")
+    print("=" * 60)
+    print(f"Reading CSV files from: {INPUT_DIR}")
+    print(f"Output will be saved to: {OUTPUT_FILE}")
+
+    # Check if input directory exists
+    if not INPUT_DIR.exists():
+        print(f"ERROR: Input directory '{INPUT_DIR}' not found")
+        print(f"Current working directory: {Path.cwd()}")
+        print("STOPPING EXECUTION to verify input directory path")
+        exit(1)
 
-# Write aggregated CSV 
-print("\nWriting aggregated statistics...")
+    # Count files for progress tracking
+    csv_files = list(INPUT_DIR.glob("*_size_analysis.csv"))
+    total_files = len(csv_files)
 
-with OUTPUT_FILE.open("w", encoding="utf-8", newline="") as outf:
-    fieldnames = [
-        "explanation_type", "ranking", "metric", "num_debates",
-        "mean", "median", "std_dev"
-    ] + BIN_LABELS
-    writer = csv.DictWriter(outf, fieldnames=fieldnames)
-    writer.writeheader()
+    if total_files == 0:
+        print(f"ERROR: No size analysis CSV files found in '{INPUT_DIR}'")
+        print(f"Directory contents: {list(INPUT_DIR.iterdir()) if INPUT_DIR.exists() else 'Directory does not exist'}")
+        print("STOPPING EXECUTION to verify file discovery")
+        exit(1)
 
-    # Sort keys for organized output
-    sorted_keys = sorted(data.keys(), key=lambda x: (x[2], x[0], x[1]))  # Sort by metric, then type, then ranking
+    print(f"Found {total_files} size analysis files to process")
+    print("-" * 60)
+
+    # Reuse cached results for files unchanged (same mtime and size) since the last run
+    file_stats = {str(p): p.stat() for p in csv_files}
+    cache = {path: entry for path, entry in load_cache().items()
+             if path in file_stats
+             and entry["mtime_ns"] == file_stats[path].st_mtime_ns
+             and entry["size"] == file_stats[path].st_size}
+    to_parse = [p for p in csv_files if str(p) not in cache]
+    print(f"Reusing cached results for {len(cache)} files, parsing {len(to_parse)}")
+
+    # Parse the remaining CSV files in parallel; partial results come back in file order
+    processed_files = len(cache)
+    if to_parse:
+        with ProcessPoolExecutor() as executor:
+            results = executor.map(parse_size_file, to_parse, chunksize=32)
+            for csv_file in to_parse:
+                try:
+                    partial = next(results)
+                except Exception as e:
+                    print(f"ERROR: {e}")
+                    print("STOPPING EXECUTION due to corrupted/incomplete file.")
+                    exit(1)
+
+                stat = file_stats[str(csv_file)]
+                cache[str(csv_file)] = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size":     stat.st_size,
+                    "rows":     [[*key, values] for key, values in partial.items()],
+                }
+                processed_files += 1
+
+                # Progress update every 500 files
+                if processed_files % 500 == 0:
+                    print(f"Progress: {processed_files}/{total_files} files processed")
+        save_cache(cache)
+
+    # Merge per-file results in file order
+    for csv_file in csv_files:
+        for etype, rank, metric, values in cache[str(csv_file)]["rows"]:
+            data[(etype, rank, metric)].extend(values)
+
+    print(f"✓ Successfully processed {processed_files}/{total_files} files")
+    print(f"✓ Total data points collected: {sum(len(values) for values in data.values())}")
+
+    # Write aggregated CSV 
+    print("\nWriting aggregated statistics...")
+
+    with OUTPUT_FILE.open("w", encoding="utf-8", newline="") as outf:
+        fieldnames = [
+            "explanation_type", "ranking", "metric", "num_debates",
+            "mean", "median", "std_dev"
+        ] + BIN_LABELS
+        writer = csv.writer(outf)
+        writer.writerow(fieldnames)
+
+        # Sort keys for organized output
+        sorted_keys = sorted(data.keys(), key=lambda x: (x[2], x[0], x[1]))  # Sort by metric, then type, then ranking
     
-    for (etype, rank, metric), values in [(k, data[k]) for k in sorted_keys]:
-        N       = len(values)
-        mean_   = statistics.mean(values)   if N else 0.0
-        median_ = statistics.median(values) if N else 0.0
-        stddev_ = statistics.stdev(values)  if N > 1 else 0.0
-
-        # Calculate bins 
-        bins = {label: 0 for label in BIN_LABELS}
-        for v in values:
-            for i in range(len(BIN_EDGES) - 1):
-                low, high = BIN_EDGES[i], BIN_EDGES[i+1]
-                if (v == 100.0 and i == len(BIN_EDGES) - 2) or (low <= v < high):
-                    bins[BIN_LABELS[i]] += 1
-                    break
-
-        # Console output (enhanced for better readability)
-        print(f"→ {etype:<12} | {rank:<15} | {metric:<20} : {N:>5} debates | Mean: {mean_:>6.2f}% | Median: {median_:>6.2f}%")
-
-        # Build output row 
-        row = {
-            "explanation_type": etype,
-            "ranking":          rank,
-            "metric":           metric,
-            "num_debates":      N,  # Changed from num_graphs to num_debates
-            "mean":             f"{mean_:.2f}",
-            "median":           f"{median_:.2f}",
-            "std_dev":          f"{stddev_:.2f}",
-        }
-        row.update(bins)
-        writer.writerow(row)
-
-print(f"\n✅ Aggregated statistics with bins written to {OUTPUT_FILE}")
-
-# Summary statistics
-print("\n" + "=" * 60)
-print("SUMMARY")
-print("=" * 60)
-unique_combinations = len(data)
-total_data_points = sum(len(values) for values in data.values())
-print(f"Unique combinations processed: {unique_combinations}")
-print(f"Total data points: {total_data_points:,}")
-print(f"Average data points per combination: {total_data_points/unique_combinations:.1f}")
-
-# Show what combinations were found
-explanation_types = set(k[0] for k in data.keys())
-rankings = set(k[1] for k in data.keys())
-metrics = set(k[2] for k in data.keys())
-
-print(f"\nExplanation types found: {sorted(explanation_types)}")
-print(f"Rankings found: {sorted(rankings)}")
-print(f"Metrics analyzed: {sorted(metrics)}")
-print(f"\nReady for statistical analysis and visualization!")
\ No newline at end of file
+        for (etype, rank, metric), values in [(k, data[k]) for k in sorted_keys]:
+            N       = len(values)
+            mean_   = math.fsum(values) / N         if N else 0.0
+            median_ = statistics.median(values)     if N else 0.0
+            stddev_ = math.sqrt(math.fsum((v - mean_) ** 2 for v in values) / (N - 1)) if N > 1 else 0.0
+
+            # Calculate bins: the bin index follows directly from the value, 100 falls in the last bin
+            counts   = [0] * len(BIN_LABELS)
+            last_bin = len(BIN_LABELS) - 1
+            for v in values:
+                if BIN_EDGES[0] <= v < BIN_EDGES[-1]:
+                    counts[int((v - BIN_EDGES[0]) // BIN_WIDTH)] += 1
+                elif v == BIN_EDGES[-1]:
+                    counts[last_bin] += 1
+
+            # Console output (enhanced for better readability), only with --verbose
+            if args.verbose:
+                print(f"→ {etype:<12} | {rank:<15} | {metric:<20} : {N:>5} debates | Mean: {mean_:>6.2f}% | Median: {median_:>6.2f}%")
+
+            # Build output row in fieldnames order (num_debates: changed from num_graphs)
+            writer.writerow([etype, rank, metric, N,
+                             f"{mean_:.2f}", f"{median_:.2f}", f"{stddev_:.2f}", *counts])
+
+    print(f"\n✅ Aggregated statistics with bins written to {OUTPUT_FILE}")
+
+    # Summary statistics
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    unique_combinations = len(data)
+    total_data_points = sum(len(values) for values in data.values())
+    print(f"Unique combinations processed: {unique_combinations}")
+    print(f"Total data points: {total_data_points:,}")
+    print(f"Average data points per combination: {total_data_points/unique_combinations:.1f}")
+
+    # Show what combinations were found
+    explanation_types = set(k[0] for k in data.keys())
+    rankings = set(k[1] for k in data.keys())
+    metrics = set(k[2] for k in data.keys())
+
+    print(f"\nExplanation types found: {sorted(explanation_types)}")
+    print(f"Rankings found: {sorted(rankings)}")
+    print(f"Metrics analyzed: {sorted(metrics)}")
+    print(f"\nReady for statistical analysis and visualization!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,22 @@
 #!/usr/bin/env python3
 # analyze_and_save_correlations.py
 
+import argparse
+import io
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import pearsonr, spearmanr
+from scipy.stats import beta, t as student_t
 from pathlib import Path
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional, fall back to the stdlib parser
+    from json import loads as json_loads
+
+parser = argparse.ArgumentParser(description="Correlations between weight changes and argument coverage")
+parser.add_argument("--plots", action="store_true", help="Also save a scatter plot per (type, heuristic)")
+args = parser.parse_args()
+
 # 1) Répertoires
 COV_DIR    = Path("size_explanation")
 WEIGHT_DIR = Path("debates_with_target_weight_change")
@@ -16,115 +26,150 @@ PLOTS_DIR  = OUT_DIR / "plots"
 OUT_FILE   = OUT_DIR / "correlations_by_type_heuristic.csv"
 
 OUT_DIR.mkdir(exist_ok=True)
-PLOTS_DIR.mkdir(exist_ok=True)
+if args.plots:
+    PLOTS_DIR.mkdir(exist_ok=True)
 
 # 2) Chargement et fusion
-records = []
+COV_COLUMNS = ["debate_id", "t_id", "explanation_type", "ranking", "pct_args_of_graph"]
+
+
+def read_coverage_files(paths):
+    """Parse every size analysis CSV with a single read_csv call.
+
+    All files share the header written by generate_size_analysis.py, so their
+    bodies are concatenated under that header and parsed once by the C engine.
+    """
+    header, bodies = None, []
+    for path in paths:
+        first, _, body = path.read_text(encoding="utf-8").partition("\n")
+        if header is None:
+            header = first
+        elif first != header:
+            raise ValueError(f"Unexpected header in {path.name}: {first!r}")
+        if body and not body.endswith("\n"):
+            body += "\n"
+        bodies.append(body)
+    return pd.read_csv(io.StringIO(header + "\n" + "".join(bodies)), usecols=COV_COLUMNS)
+
 
-for cov_path in COV_DIR.glob("*_size_analysis.csv"):
+cov_paths = list(COV_DIR.glob("*_size_analysis.csv"))
+if not cov_paths:
+    raise RuntimeError("Aucune donnée fusionnée – vérifiez les chemins et patterns.")
+
+try:
+    df_cov = read_coverage_files(cov_paths)
+except Exception as error:
+    print(f"❌ ERROR: CSV read failed: {error}")
+    raise
+df_cov = df_cov.rename(columns={"ranking": "heuristic"})
+
+# Index the weight JSONs once by (debate_id, t_id) from their
+# `<debate_id>_T<k>of<n>_<t_id>.json` names instead of globbing per coverage file
+weight_files = {}
+for json_path in sorted(WEIGHT_DIR.glob("*.json")):
+    key = (json_path.stem.split("_", 1)[0], json_path.stem.rsplit("_", 1)[-1])
+    weight_files.setdefault(key, json_path)
+
+weight_rows = []
+for cov_path in cov_paths:
     try:
         parts = cov_path.stem.split("_")
         if len(parts) < 7:
             raise ValueError(f"Filename parsing failed for {cov_path.name}")
         did = parts[0]
         tid = parts[2]
-        #breakpoint()  # Breakpoint 1
-        try:
-            df_cov = pd.read_csv(cov_path, engine="python")
-        except Exception as e:
-            raise RuntimeError(f"CSV read failed for {cov_path.name}: {e}")
-        #breakpoint()  # Breakpoint 2
-        df_cov = df_cov.rename(columns={"ranking": "heuristic"})
-        df_cov = df_cov[[
-            "debate_id",
-            "t_id",
-            "explanation_type",
-            "heuristic",
-            "pct_args_of_graph"
-        ]]
-        json_files = list(WEIGHT_DIR.glob(f"{did}_*_{tid}.json"))
-        if not json_files:
+        json_file = weight_files.get((did, tid))
+        if json_file is None:
             raise FileNotFoundError(f"No JSON file for debate_id={did}, t_id={tid}")
-        import json
         try:
-            with open(json_files[0], 'r', encoding='utf-8') as f:
-                debate_data = json.load(f)
+            debate_data = json_loads(json_file.read_bytes())
         except Exception as e:
-            raise RuntimeError(f"JSON load failed for {json_files[0].name}: {e}")
+            raise RuntimeError(f"JSON load failed for {json_file.name}: {e}")
         target_node = debate_data.get('nodes', {}).get(tid, {})
-        initial_weight_t = target_node.get('initial_weight', 0.0)
-        final_weight_t = target_node.get('final_weight', 0.0)
-        #breakpoint()  # Breakpoint 3
-        df_w = pd.DataFrame({
-            "debate_id": [int(did)],
-            "t_id": [float(tid)],
-            "initial_weight_t": [initial_weight_t],
-            "final_weight_t": [final_weight_t]
-        })
-        #breakpoint()  # Breakpoint 4
-        try:
-            df = pd.merge(df_cov, df_w, on=["debate_id","t_id"])
-        except Exception as e:
-            raise RuntimeError(f"Merge failed for debate_id={did}, t_id={tid}: {e}")
-        #breakpoint()  # Breakpoint 5
-        df["weight_diff"] = (df.final_weight_t - df.initial_weight_t).abs()
-        #breakpoint()  # Breakpoint 6
-        records.append(df)
+        weight_rows.append((
+            int(did),
+            float(tid),
+            target_node.get('initial_weight', 0.0),
+            target_node.get('final_weight', 0.0),
+        ))
     except Exception as error:
         print(f"❌ ERROR: {error}")
         raise
 
+df_w = pd.DataFrame(weight_rows, columns=["debate_id", "t_id", "initial_weight_t", "final_weight_t"])
+df_w = df_w.drop_duplicates(subset=["debate_id", "t_id"])
 
-if not records:
+full_df = pd.merge(df_cov, df_w, on=["debate_id", "t_id"])
+if full_df.empty:
     raise RuntimeError("Aucune donnée fusionnée – vérifiez les chemins et patterns.")
-
-full_df = pd.concat(records, ignore_index=True)
+full_df["weight_diff"] = (full_df.final_weight_t - full_df.initial_weight_t).abs()
 
 # 3) Calcul des corrélations pour chaque (type, heuristic)
-results = []
-groups = full_df.groupby(["explanation_type","heuristic"])
-for (etype, heur), grp in groups:
-    if len(grp) < 3:
-        continue
-    #breakpoint()  # Breakpoint 7: At start of correlation calculation loop
-    x = grp.weight_diff
-    y = grp.pct_args_of_graph
-    r_p, p_p = pearsonr(x, y)
-    r_s, p_s = spearmanr(x, y)
-    results.append({
-        "explanation_type": etype,
-        "heuristic":        heur,
-        "n_samples":        len(grp),
-        "pearson_r":        r_p,
-        "pearson_p":        p_p,
-        "spearman_rho":     r_s,
-        "spearman_p":       p_s
-    })
-
-pd.DataFrame(results).to_csv(OUT_FILE, index=False)
+# Pearson on the raw values and Spearman as Pearson of within-group average
+# ranks, each computed for all groups in one vectorized groupby pass
+KEYS = ["explanation_type", "heuristic"]
+XY   = ["weight_diff", "pct_args_of_graph"]
+
+groups    = full_df.groupby(KEYS)
+n_samples = groups.size()
+ranks     = groups[XY].rank()
+ranks[KEYS] = full_df[KEYS]
+
+pearson_r    = groups[XY].corr().xs("weight_diff", level=-1)["pct_args_of_graph"].clip(-1, 1)
+spearman_rho = ranks.groupby(KEYS)[XY].corr().xs("weight_diff", level=-1)["pct_args_of_graph"].clip(-1, 1)
+
+# Two-sided p-values only for groups with enough samples, same tests as scipy's pearsonr/spearmanr
+valid = n_samples[n_samples >= 3].index
+n     = n_samples[valid].to_numpy(dtype=float)
+r_p   = pearson_r[valid].to_numpy()
+r_s   = spearman_rho[valid].to_numpy()
+p_p   = 2 * beta.sf(np.abs(r_p), n / 2 - 1, n / 2 - 1, loc=-1, scale=2)
+with np.errstate(divide="ignore", invalid="ignore"):
+    t_s = r_s * np.sqrt((n - 2) / ((1.0 - r_s) * (1.0 + r_s)))
+p_s   = 2 * student_t.sf(np.abs(t_s), n - 2)
+
+results = pd.DataFrame({
+    "explanation_type": valid.get_level_values(0),
+    "heuristic":        valid.get_level_values(1),
+    "n_samples":        n_samples[valid].to_numpy(),
+    "pearson_r":        r_p,
+    "pearson_p":        p_p,
+    "spearman_rho":     r_s,
+    "spearman_p":       p_s
+})
+
+results.to_csv(OUT_FILE, index=False)
 print(f"✅ Corrélations enregistrées dans {OUT_FILE}")
 
-# 4) Tracés par combinaison
-sns.set(style="whitegrid", font_scale=1.1)
-for (etype, heur), grp in groups:
-    if len(grp) < 3:
-        continue
-
-    plt.figure(figsize=(6,4))
-    ax = sns.regplot(
-        data=grp,
-        x="weight_diff",
-        y="pct_args_of_graph",
-        scatter_kws={"alpha":0.5, "s":40},
-        line_kws={"color":"C1"}
-    )
-    title = f"{etype.capitalize()} – {heur.replace('_',' ').capitalize()}"
-    ax.set_title(title)
-    ax.set_xlabel("Absolute value of weight difference")
-    ax.set_ylabel("Argument coverage")
-
-    out_png = PLOTS_DIR / f"scatter_{etype}_{heur}.png"
-    plt.tight_layout()
-    plt.savefig(out_png)
-    plt.close()
-    print(f"✅ Figure enregistrée dans {out_png}")
+# 4) Tracés par combinaison (only with --plots); one figure is reused for every group
+if args.plots:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set(style="whitegrid", font_scale=1.1)
+    fig, ax = plt.subplots(figsize=(6,4))
+    for (etype, heur), grp in groups:
+        if len(grp) < 3:
+            continue
+
+        ax.clear()
+        sns.regplot(
+            data=grp,
+            x="weight_diff",
+            y="pct_args_of_graph",
+            scatter_kws={"alpha":0.5, "s":40},
+            line_kws={"color":"C1"},
+            ax=ax
+        )
+        title = f"{etype.capitalize()} – {heur.replace('_',' ').capitalize()}"
+        ax.set_title(title)
+        ax.set_xlabel("Absolute value of weight difference")
+        ax.set_ylabel("Argument coverage")
+
+        out_png = PLOTS_DIR / f"scatter_{etype}_{heur}.png"
+        fig.tight_layout()
+        fig.savefig(out_png)
+        print(f"✅ Figure enregistrée dans {out_png}")
+    plt.close(fig)
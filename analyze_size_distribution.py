@@ -6,8 +6,34 @@ Study debate size distribution to determine appropriate size categories
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import csv
 import glob
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+def read_num_args(file_path):
+    """Return total_graph_args from the first data row of a size analysis CSV, or None if it has no rows.
+
+    All rows of a file share the same total_graph_args, so only the header and
+    the first data line are read.
+    """
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        first_row = next(reader, None)
+    if header is None or first_row is None:
+        return None
+    return int(first_row[header.index('total_graph_args')])
+
+def first_num_args(file_path):
+    """Return (source_filename, num_args) for one file, or None if it is empty or unreadable"""
+    try:
+        num_args = read_num_args(file_path)
+    except Exception:
+        return None
+    if num_args is None:
+        return None
+    return os.path.basename(file_path).replace('.csv', ''), num_args
 
 def analyze_debate_size_distribution():
     """Analyze the distribution of debate sizes to determine appropriate categories"""
@@ -21,30 +47,20 @@ def analyze_debate_size_distribution():
     files = glob.glob("size_explanation/*.csv")
     print(f"📊 Found {len(files)} files")
     
+    # Per-file work is a tiny header read, so overlap the opens with threads
     all_data = []
     processed_count = 0
     
-    for file_path in files:
-        try:
-            df_file = pd.read_csv(file_path)
-            source_filename = os.path.basename(file_path).replace('.csv', '')
-            
-            # Get unique debate size (take first row since all rows have same total_graph_args)
-            if not df_file.empty:
-                num_args = int(df_file['total_graph_args'].iloc[0])
-                all_data.append({
-                    'source_filename': source_filename,
-                    'num_args': num_args
-                })
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        for result in executor.map(first_num_args, files):
+            if result is not None:
+                all_data.append(result)
             
             processed_count += 1
             if processed_count % 1000 == 0:
                 print(f"   Processed {processed_count:,} files...")
-                
-        except Exception:
-            continue
     
-    df = pd.DataFrame(all_data)
+    df = pd.DataFrame(all_data, columns=['source_filename', 'num_args'])
     print(f"✅ Loaded {len(df):,} unique debates")
     
     # Basic statistics
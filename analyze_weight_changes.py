@@ -2,10 +2,17 @@
 # analyze_weight_changes.py
 # 
 
-import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple
 
+import numpy as np
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional, fall back to the stdlib parser
+    from json import loads as json_loads
+
 
 def extract_target_id_from_filename(fname: str) -> str:
     """Extract the target id from filename of form
@@ -20,6 +27,39 @@ def extract_target_id_from_filename(fname: str) -> str:
     return last[:-5]
 
 
+def read_target_weights(fpath: str) -> Tuple:
+    """Read the target's weights from one file.
+
+    Returns (target_id, initial_weight, final_weight, error); error is None
+    on success, otherwise the weights are None and error says what went wrong.
+    """
+    fname = os.path.basename(fpath)
+    try:
+        with open(fpath, 'rb') as f:
+            data = json_loads(f.read())
+    except Exception as e:
+        return None, None, None, f"read_error: {e}"
+    
+    # Extract target ID from filename
+    target_id = extract_target_id_from_filename(fname)
+    if not target_id:
+        return None, None, None, "could_not_parse_target_id"
+        
+    # Get nodes
+    nodes = data.get('nodes', {})
+    if target_id not in nodes:
+        return target_id, None, None, f"target_id_{target_id}_not_found"
+        
+    # Get weights
+    node = nodes[target_id]
+    initial_weight = node.get('initial_weight')
+    final_weight = node.get('final_weight')
+    
+    if initial_weight is None or final_weight is None:
+        return target_id, None, None, "missing_weights"
+    return target_id, initial_weight, final_weight, None
+
+
 def analyze_weight_changes(input_folder: str = 'debates_with_target_weight_change') -> Dict:
     """Analyze weight changes in target arguments."""
     
@@ -27,57 +67,37 @@ def analyze_weight_changes(input_folder: str = 'debates_with_target_weight_chang
         print(f"Error: Folder {input_folder} does not exist")
         return {}
     
-    strengthening = []  # final > initial
-    weakening = []      # final < initial
-    no_change = []      # final = initial (shouldn't happen in this filtered set)
     errors = []         # processing errors
     
-    total_files = 0
+    # scandir yields the names without a stat per entry
+    with os.scandir(input_folder) as it:
+        entries = sorted((e for e in it if e.name.endswith('.json')), key=lambda e: e.name)
+    total_files = len(entries)
     
-    for fname in sorted(os.listdir(input_folder)):
-        if not fname.endswith('.json'):
-            continue
-            
-        total_files += 1
-        fpath = os.path.join(input_folder, fname)
-        
-        try:
-            with open(fpath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception as e:
-            errors.append((fname, f"read_error: {e}"))
-            continue
-        
-        # Extract target ID from filename
-        target_id = extract_target_id_from_filename(fname)
-        if not target_id:
-            errors.append((fname, "could_not_parse_target_id"))
-            continue
-            
-        # Get nodes
-        nodes = data.get('nodes', {})
-        if target_id not in nodes:
-            errors.append((fname, f"target_id_{target_id}_not_found"))
-            continue
-            
-        # Get weights
-        node = nodes[target_id]
-        initial_weight = node.get('initial_weight')
-        final_weight = node.get('final_weight')
-        
-        if initial_weight is None or final_weight is None:
-            errors.append((fname, "missing_weights"))
-            continue
-            
-        # Classify weight change
-        weight_change = final_weight - initial_weight
-        
-        if weight_change > 0:
-            strengthening.append((fname, target_id, initial_weight, final_weight, weight_change))
-        elif weight_change < 0:
-            weakening.append((fname, target_id, initial_weight, final_weight, weight_change))
+    # Parse the files in parallel, results come back in file order
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(read_target_weights, [e.path for e in entries], chunksize=32))
+    
+    analyzed = []
+    for entry, (target_id, initial_weight, final_weight, error) in zip(entries, results):
+        if error:
+            errors.append((entry.name, error))
         else:
-            no_change.append((fname, target_id, initial_weight, final_weight, weight_change))
+            analyzed.append((entry.name, target_id, initial_weight, final_weight))
+    
+    # Classify weight changes on whole arrays
+    initial = np.array([row[2] for row in analyzed], dtype=float)
+    final = np.array([row[3] for row in analyzed], dtype=float)
+    deltas = final - initial
+    
+    strengthening_mask = deltas > 0   # final > initial
+    weakening_mask = deltas < 0       # final < initial
+    no_change_mask = ~(strengthening_mask | weakening_mask)  # the rest: final = initial, or a NaN delta
+    
+    changes = deltas.tolist()
+    strengthening = [analyzed[i] + (changes[i],) for i in np.flatnonzero(strengthening_mask)]
+    weakening = [analyzed[i] + (changes[i],) for i in np.flatnonzero(weakening_mask)]
+    no_change = [analyzed[i] + (changes[i],) for i in np.flatnonzero(no_change_mask)]
     
     # Print results
     print("\n" + "="*60)
@@ -105,12 +125,12 @@ def analyze_weight_changes(input_folder: str = 'debates_with_target_weight_chang
     
     # Show weight change statistics
     if strengthening:
-        changes = [change for _, _, _, _, change in strengthening]
-        print(f"Strengthening changes: min={min(changes):.4f}, max={max(changes):.4f}, avg={sum(changes)/len(changes):.4f}")
+        changes = deltas[strengthening_mask]
+        print(f"Strengthening changes: min={changes.min():.4f}, max={changes.max():.4f}, avg={changes.mean():.4f}")
     
     if weakening:
-        changes = [change for _, _, _, _, change in weakening]
-        print(f"Weakening changes: min={min(changes):.4f}, max={max(changes):.4f}, avg={sum(changes)/len(changes):.4f}")
+        changes = deltas[weakening_mask]
+        print(f"Weakening changes: min={changes.min():.4f}, max={changes.max():.4f}, avg={changes.mean():.4f}")
     
     # Show errors if any
     if errors:
@@ -1,34 +1,147 @@
 
 
 # ── stdlib
+import argparse
 import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
 # ── 3rd-party
-import networkx as nx
-import pandas as pd
-from pyvis.network import Network
+import numpy as np
+
+# ── optional C JSON codec (pip install orjson); falls back to the stdlib json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ── optional JIT (pip install numba); without it QEM runs in pure Python
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+# ═══════════════════ JSON I/O ════════════════════
+def read_json(path: Path) -> dict:
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def write_json(path: Path, data: dict):
+    """Indented UTF-8 JSON, written as bytes"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_bytes(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+# ═══════════════════ graph order ════════════════════
+class CycleError(ValueError):
+    """The support/attack graph of a debate is not acyclic"""
+
+
+def topological_order(pairs):
+    """Kahn's algorithm over (src, dst) edges, on integer ids; raises CycleError if cycle"""
+    ids, children, indeg = {}, [], []
+    for src_id, dst_id in pairs:
+        for n in (src_id, dst_id):
+            if n not in ids:
+                ids[n] = len(ids)
+                children.append([])
+                indeg.append(0)
+        children[ids[src_id]].append(ids[dst_id])
+        indeg[ids[dst_id]] += 1
+
+    order = []
+    dq = deque(i for i, d in enumerate(indeg) if d == 0)
+    while dq:
+        i = dq.popleft()
+        order.append(i)
+        for c in children[i]:
+            indeg[c] -= 1
+            if indeg[c] == 0:
+                dq.append(c)
+    if len(order) != len(ids):
+        raise CycleError("cycle detected")
+    names = list(ids)
+    return [names[i] for i in order]
 
 
 # ═══════════════════ QEM helper functions ════════════════════
-def calculate_energy(n, sup, att, final_acc):
-    """ Σ(final supporters) − Σ(final attackers) """
-    return sum(final_acc.get(s, 0) for s in sup.get(n, [])) - \
-           sum(final_acc.get(a, 0) for a in att.get(n, []))
+def build_csr(order, index, parents):
+    """ (indptr, idx) : parents of order[i] are idx[indptr[i]:indptr[i+1]] (integer ids) """
+    indptr, idx = [0], []
+    for n in order:
+        idx.extend(index[p] for p in parents.get(n, []))
+        indptr.append(len(idx))
+    return indptr, idx
+
+
+def qem_accept_all(sup_csr, att_csr, w0s):
+    """QEM-Semantics for every node, ids in topological order (parents have smaller ids)"""
+    indptr_sup, idx_sup = sup_csr
+    indptr_att, idx_att = att_csr
+    final_acc = [0.0] * len(w0s)
+    for i, w0 in enumerate(w0s):
+        s0, s1 = indptr_sup[i], indptr_sup[i + 1]
+        a0, a1 = indptr_att[i], indptr_att[i + 1]
+        if s0 == s1 and a0 == a1:          # no parents → base weight
+            final_acc[i] = w0
+            continue
+        # Σ(final supporters) − Σ(final attackers), summed in edge order with plain
+        # additions, as the numba kernel does (sum() is compensated from Python 3.12)
+        e_sup = 0.0
+        for k in idx_sup[s0:s1]:
+            e_sup += final_acc[k]
+        e_att = 0.0
+        for k in idx_att[a0:a1]:
+            e_att += final_acc[k]
+        e = e_sup - e_att
+        # h(e) for e > 0 and h(-e) otherwise share e*e, so no clamp is needed;
+        # e * e rather than e ** 2: pow() can round differently, and numba squares with e * e
+        x2 = e * e
+        hv = x2 / (1 + x2)
+        final_acc[i] = w0 + (1 - w0) * hv if e > 0 else w0 - w0 * hv
+    return final_acc
 
 
-def h(x):                            
-    return (max(x, 0) ** 2) / (1 + max(x, 0) ** 2)
+if njit is not None:
+    @njit(cache=True)
+    def qem_accept_all_jit(indptr_sup, idx_sup, indptr_att, idx_att, w0s):
+        """qem_accept_all compiled by numba, on int64 CSR arrays and float64 weights"""
+        final_acc = np.empty(w0s.shape[0])
+        for i in range(w0s.shape[0]):
+            w0 = w0s[i]
+            if indptr_sup[i] == indptr_sup[i + 1] and indptr_att[i] == indptr_att[i + 1]:
+                final_acc[i] = w0
+                continue
+            e_sup = 0.0
+            for k in range(indptr_sup[i], indptr_sup[i + 1]):
+                e_sup += final_acc[idx_sup[k]]
+            e_att = 0.0
+            for k in range(indptr_att[i], indptr_att[i + 1]):
+                e_att += final_acc[idx_att[k]]
+            e = e_sup - e_att
+            x2 = e * e
+            hv = x2 / (1 + x2)
+            if e > 0:
+                final_acc[i] = w0 + (1 - w0) * hv
+            else:
+                final_acc[i] = w0 - w0 * hv
+        return final_acc
 
 
-def qem_accept(n, sup, att, final_acc, w_init):
-    """QEM-Semantics"""
-    # sup est un dictionnaire où les clés sont les arguments et les valeurs sont des listes qui contiennt les supporteurs de chaque argument, si n n'appartient pas à sup ça veut dire l'argument n n'apas de supporteurs
-    if n not in sup and n not in att:      # no parents → base weight
-        return w_init[n]
-    e  = calculate_energy(n, sup, att, final_acc)
-    w0 = w_init[n]
-    return w0 + (1 - w0) * h(e) if e > 0 else w0 - w0 * h(-e)
+def qem_final_weights(sup_csr, att_csr, w0s):
+    """Final weights in topological order, through numba when it is installed"""
+    if njit is None:
+        return qem_accept_all(sup_csr, att_csr, w0s)
+    indptr_sup, idx_sup = (np.asarray(a, dtype=np.int64) for a in sup_csr)
+    indptr_att, idx_att = (np.asarray(a, dtype=np.int64) for a in att_csr)
+    return qem_accept_all_jit(indptr_sup, idx_sup, indptr_att, idx_att,
+                              np.asarray(w0s, dtype=np.float64)).tolist()
 
 
 # ═════════════ process 1 debate JSON (adds final_weight) ════════════════
@@ -37,39 +150,81 @@ def enrich_with_final(src: Path, dst: Path) -> dict:
     Read src JSON, compute final_weight for every node, save to dst.
     Return the loaded & enriched dict (for graph drawing).
     """
-    data   = json.loads(src.read_text(encoding="utf-8"))
+    data   = read_json(src)
     nodes, edges = data["nodes"], data["edges"]
 
-    # 1) initial weights as Series , prend les identifiants des arguments et leur poids intitial
-    w_init = pd.Series({nid: nd["initial_weight"] for nid, nd in nodes.items()})
+    # 1) initial weights as dict , prend les identifiants des arguments et leur poids intitial
+    w_init = {nid: nd["initial_weight"] for nid, nd in nodes.items()}
 
     # 2) supporters / attackers + graph
-    sup, att, G = {}, {}, nx.DiGraph()
+    sup, att, pairs = {}, {}, []
     # prend chaque argument a et son dictionnaire correspondant
     for src_id, e in edges.items():
         # prend l'argument b relié à a, et sa relation soit a attaque soit soutien soit rien 
         dst_id, rel = e["successor_id"], e.get("relation", 0.0)
-        G.add_edge(src_id, dst_id)
+        pairs.append((src_id, dst_id))
         #pour chaque argument qui est dst_id ça veut dire destination ajoute tous ses supporteurs dans une liste, donc sup c'est un dictionnaire où les clés sont les arguments et chaque valeur est une liste qui contient les supporteurs de chaque argument. Pareil pour les attaques
         if rel > 0:  sup.setdefault(dst_id, []).append(src_id)
         elif rel<0:  att.setdefault(dst_id, []).append(src_id)
 
-    topo = list(nx.topological_sort(G))  # raises if cycle
-    # 3) iterative QEM
-    final_acc = {}
-    for n in topo:
-        # qem_accept prend l'argument poulequel on veut calculer son degré d'acceptabilité, tous les supporteurs et attaquants de tous les arguments, la liste de poids finaux déjà calculés (ici pour le 1er argument la liste est vide mais au fur et à mesure ça se rempli), et finalement les poids initiaux de tous les arguments
-        final_acc[n] = qem_accept(n, sup, att, final_acc, w_init)
-        nodes[n]["final_weight"] = final_acc[n]
+    topo = topological_order(pairs)  # raises if cycle
+
+    # 3) QEM over integer ids in topological order (structure of arrays)
+    index = {n: i for i, n in enumerate(topo)}
+    final_acc = qem_final_weights(build_csr(topo, index, sup), build_csr(topo, index, att),
+                                  [float(w_init[n]) for n in topo])
+    for n, w1 in zip(topo, final_acc):
+        nodes[n]["final_weight"] = w1
 
     # 4) save enriched JSON
     dst.parent.mkdir(parents=True, exist_ok=True)
-    dst.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    write_json(dst, data)
 
     return data
 
 
 # ═════════════ draw graph (initial & final shown) ═══════════════════════
+# vis-network page (same library and layout pyvis used), filled by plain substitution
+GRAPH_TEMPLATE = """<html>
+    <head>
+        <meta charset="utf-8">
+        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css" crossorigin="anonymous" referrerpolicy="no-referrer" />
+        <script src="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js" crossorigin="anonymous" referrerpolicy="no-referrer"></script>
+        <style type="text/css">
+             #mynetwork {
+                 width: 100%;
+                 height: 750px;
+                 background-color: #ffffff;
+                 border: 1px solid lightgray;
+                 position: relative;
+                 float: left;
+             }
+        </style>
+    </head>
+    <body>
+        <div id="mynetwork"></div>
+        <script type="text/javascript">
+              var nodes = new vis.DataSet({{NODES_JSON}});
+              var edges = new vis.DataSet({{EDGES_JSON}});
+              var options = {"layout":{"hierarchical":{"enabled":true,"direction":"DU",
+                                                       "sortMethod":"directed",
+                                                       "levelSeparation":80,"nodeSpacing":80}},
+                             "physics":{"enabled":false},
+                             "edges":{"smooth":false},
+                             "interaction":{"navigationButtons":true}};
+              var network = new vis.Network(document.getElementById("mynetwork"),
+                                            {nodes: nodes, edges: edges}, options);
+        </script>
+    </body>
+</html>
+"""
+
+
+def to_script_json(items) -> str:
+    """JSON for inlining in a <script> block"""
+    return json.dumps(items).replace("</", "<\\/")
+
+
 def build_tree_graph(data: dict, html_path: Path):
     """
     White circle, black border.
@@ -78,65 +233,77 @@ def build_tree_graph(data: dict, html_path: Path):
         w0=<initial_weight>
         w1=<final_weight>
     """
-    net = Network(height="750px", width="100%", directed=True, bgcolor="#ffffff")
-
     # ---- nodes ----
+    nodes = []
     for nid, nd in data["nodes"].items():
         w,  𝜎 = nd["initial_weight"], nd["final_weight"]
         label  = f"{nid}\nw={w:.2f}\n𝜎={𝜎:.2f}"
         tip    = f"Node: {nid} | Initial: {w:.3f} | Final: {𝜎:.3f} | Votes: {nd.get('votes', {})}"
-        net.add_node(
-            nid, label=label, title=tip,
-            color={"border":"#000","background":"#fff"},
-            shape="circle", size=10 + 30 * w,
-            font={"multi":"html"}
-        )
+        nodes.append({
+            "id": nid, "label": label, "title": tip,
+            "color": {"border":"#000","background":"#fff"},
+            "shape": "circle", "size": 10 + 30 * w,
+            "font": {"multi":"html"}
+        })
 
     # ---- edges ----
+    edges = []
     for src, e in data["edges"].items():
         dst, rel = e["successor_id"], e.get("relation",0.0)
         if rel == 0:   # neutral / unknown
             continue
-        net.add_edge(
-            src, dst,
-            color="#d62728" if rel < 0 else "#2ca02c",
-            arrows="to", width=2
-        )
-
-    # ---- layout (compact tree) ----
-    net.set_options("""
-    {"layout":{"hierarchical":{"enabled":true,"direction":"DU",
-                               "sortMethod":"directed",
-                               "levelSeparation":80,"nodeSpacing":80}},
-     "physics":{"enabled":false},
-     "edges":{"smooth":false},
-     "interaction":{"navigationButtons":true}}
-    """)
+        edges.append({
+            "from": src, "to": dst,
+            "color": "#d62728" if rel < 0 else "#2ca02c",
+            "arrows": "to", "width": 2
+        })
 
-    net.write_html(str(html_path), open_browser=False)
+    html = GRAPH_TEMPLATE.replace("{{NODES_JSON}}", to_script_json(nodes)) \
+                         .replace("{{EDGES_JSON}}", to_script_json(edges))
+    html_path.write_bytes(html.encode("utf-8"))
 
 
 # ═════════════════════ batch runner ═════════════════════════
+def process_one(src_json: Path, draw: bool, json_dst_dir: Path, graph_dst_dir: Path):
+    """Enrich (and draw if asked) one debate; return (name, ok), ok is False if it has a cycle"""
+    try:
+        debate_dict = enrich_with_final(src_json, json_dst_dir / src_json.name)
+        if draw:
+            build_tree_graph(debate_dict, graph_dst_dir / f"{src_json.stem}.html")
+    except CycleError:
+        return src_json.name, False
+    return src_json.name, True
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add QEM final weights to every debate")
+    parser.add_argument("--draw", action="store_true", help="Also write an HTML graph per debate")
+    parser.add_argument("--sample", type=int, default=None, help="With --draw, only draw the first N debates")
+    args = parser.parse_args()
+
     BASE = Path(__file__).resolve().parent
     SRC_DIR = BASE / "kialo_debates_initial_weights_added"
     JSON_DST_DIR   = BASE / "kialo_debates_final_weights_added"
     GRAPH_DST_DIR  = BASE / "graphs_final_weights_added"
-    GRAPH_DST_DIR.mkdir(parents=True, exist_ok=True)
+    if args.draw:
+        GRAPH_DST_DIR.mkdir(parents=True, exist_ok=True)
+    JSON_DST_DIR.mkdir(parents=True, exist_ok=True)
 
+    # Debates are independent: one worker handles each end-to-end
+    worker = partial(process_one, json_dst_dir=JSON_DST_DIR, graph_dst_dir=GRAPH_DST_DIR)
+    src_files = list(SRC_DIR.glob("*.json"))
+    draw_flags = [args.draw and (args.sample is None or i < args.sample) for i in range(len(src_files))]
     processed = skipped = 0
-    for src_json in SRC_DIR.glob("*.json"):
-        dst_json   = JSON_DST_DIR  / src_json.name
-        graph_html = GRAPH_DST_DIR / f"{src_json.stem}.html"
-        try:
-            debate_dict = enrich_with_final(src_json, dst_json)
-            build_tree_graph(debate_dict, graph_html)
-            processed += 1
-            print(f"✔ {src_json.name}")
-        except nx.NetworkXUnfeasible:
-            skipped += 1
-            print(f"✗ {src_json.name} (cycle detected, skipped)")
+    with ProcessPoolExecutor() as executor:
+        for name, ok in executor.map(worker, src_files, draw_flags, chunksize=8):
+            if ok:
+                processed += 1
+                print(f"✔ {name}")
+            else:
+                skipped += 1
+                print(f"✗ {name} (cycle detected, skipped)")
 
     print(f"\n🎉 Done.  {processed} debates processed, {skipped} skipped.")
     print(f"JSON with final weights → {JSON_DST_DIR}")
-    print(f"Graphs                → {GRAPH_DST_DIR}")
+    if args.draw:
+        print(f"Graphs                → {GRAPH_DST_DIR}")
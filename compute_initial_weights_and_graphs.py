@@ -1,15 +1,25 @@
 #!/usr/bin/env python3
 # compute_initial_weights_and_graphs.py
 # ───────────────────────── Imports ─────────────────────────
-import json, textwrap
+import json, os, textwrap
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
 
 
 
 
-from pyvis.network import Network                # interactive graphs
-import matplotlib.cm as cm                        # colour map "Blues"
-import matplotlib.colors as mcolors               # RGB → #RRGGBB
+import numpy as np                                # vectorised vote aggregation
+
+try:
+    import orjson                                 # optional C JSON codec
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit, prange                # optional fused weight kernel
+except ImportError:
+    njit = None
 
 # ───────────────────────── Paths ──────────────────────────
 BASE_DIR  = Path(__file__).resolve().parent
@@ -21,6 +31,19 @@ DST_DIR.mkdir(exist_ok=True)
 GRAPH_DIR.mkdir(exist_ok=True)
 
 # ─────────────────── Helper functions ─────────────────────
+def read_json(path: Path) -> dict:
+    data = path.read_bytes()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def write_json(path: Path, data: dict):
+    """Indented UTF-8 JSON, written as bytes"""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_bytes(json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
 def aggregate_votes(votes: dict, neutral: float = 0.5) -> float:
     """
     Compute the initial weight s_i(a, w) described by Yang et al. [2]  
@@ -51,49 +74,168 @@ def aggregate_votes(votes: dict, neutral: float = 0.5) -> float:
         • Σ v_k  = total number of votes (normalisation)
     """
 
-    # ── 1) fixed weights w for scores 0 .. 4
-    weights = [0.00, 0.25, 0.50, 0.75, 1.00]
+    return float(aggregate_votes_all([votes], neutral)[0])
+
+
+# fixed weights w for scores 0 .. 4
+VOTE_WEIGHTS = np.array([0.00, 0.25, 0.50, 0.75, 1.00])
+
+
+def aggregate_votes_all(vote_dicts: list, neutral: float = 0.5) -> np.ndarray:
+    """
+    `aggregate_votes` for many nodes at once: one row of the (N, 5) count
+    matrix per vote dict, a single dot product with the weights w, and a
+    division by the row totals (neutral where nobody voted).
+
+    Every c_k · w_k is a multiple of 0.25, so the sums are exact and the
+    result matches the scalar formula bit for bit.
+    """
+    return initial_weights(vote_counts(vote_dicts), neutral)
+
 
-    # ── 2) build the vote-count vector v from anonymized counts
-    # votes.get(str(i), 0) returns the count for key "i" (or 0 if missing)
-    counts = [votes.get(str(i), 0) for i in range(5)]
+def vote_counts(vote_dicts: list) -> np.ndarray:
+    """(N, 5) vote-count matrix v, one row per vote dict"""
+    # votes.get(str(k), 0) returns the count for key "k" (or 0 if missing)
+    return np.fromiter((votes.get(str(k), 0) for votes in vote_dicts for k in range(5)),
+                       dtype=np.float64, count=5 * len(vote_dicts)).reshape(-1, 5)
 
-    # total number of people who voted on this argument
-    total = sum(counts)
 
-    # ── 3) if nobody voted, return the neutral default (0.5)
-    if total == 0:
-        return neutral
+def initial_weights(counts: np.ndarray, neutral: float = 0.5) -> np.ndarray:
+    """s_i(a) for every row of the (N, 5) vote-count matrix"""
+    if njit is not None:
+        return initial_weights_kernel(counts, neutral)
 
-    # ── 4) compute the weighted average  (v · w) / total
-    weighted_sum = sum(c * w for c, w in zip(counts, weights))
-    return weighted_sum / total
+    # total number of people who voted on each argument
+    totals = counts.sum(axis=1)
 
+    # weighted average (v · w) / total, neutral default (0.5) if nobody voted
+    weighted = counts @ VOTE_WEIGHTS
+    return np.where(totals == 0, neutral, weighted / np.maximum(totals, 1))
 
 
-def blues(weight: float) -> str:
-    """Return a darker blue (#RRGGBB) as the weight increases."""
-    rgb = cm.get_cmap("Blues")(0.3 + 0.7 * weight)[:3]  # modern Matplotlib call
-    return mcolors.to_hex(rgb)
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def initial_weights_kernel(counts, neutral):
+        """Row total, (v · w) and the neutral fallback fused in one parallel pass over the (N, 5) counts"""
+        n   = counts.shape[0]
+        out = np.empty(n)
+        for i in prange(n):
+            total = counts[i, 0] + counts[i, 1] + counts[i, 2] + counts[i, 3] + counts[i, 4]
+            if total == 0:
+                out[i] = neutral
+            else:
+                out[i] = (0.25 * counts[i, 1] + 0.5 * counts[i, 2] + 0.75 * counts[i, 3] + counts[i, 4]) / total
+        return out
 
 
-def enrich_and_save(src: Path, dst: Path) -> dict:
+@dataclass
+class Debate:
     """
-    Read JSON file `src`, add 'initial_weight' to every node,
-    write the enriched file to `dst`, and return the JSON dict.
+    One debate as parallel arrays (structure of arrays) instead of nested
+    dicts. `data` is the parsed JSON it was built from; `to_json` writes the
+    initial weights back into it for saving.
     """
-    data = json.loads(src.read_text(encoding="utf-8"))
+    data:      dict
+    ids:       list          # node ids, row order of the arrays below
+    votes:     np.ndarray    # (N, 5) vote counts, column k = score k
+    iw:        np.ndarray    # (N,)   initial weights
+    edges_src: list          # edge source ids
+    edges_dst: list          # edge successor ids
+    edges_rel: np.ndarray    # edge relations (>0 support, <0 attack, 0 neutral)
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Debate":
+        nodes, edges = data["nodes"], data["edges"]
+        return cls(
+            data      = data,
+            ids       = list(nodes),
+            votes     = vote_counts([nd.get("votes", {}) for nd in nodes.values()]),
+            iw        = np.full(len(nodes), np.nan),
+            edges_src = list(edges),
+            edges_dst = [e["successor_id"] for e in edges.values()],
+            edges_rel = np.fromiter((e.get("relation", 0.0) for e in edges.values()),
+                                    dtype=np.float64, count=len(edges)),
+        )
+
+    def to_json(self) -> dict:
+        nodes = self.data["nodes"]
+        for nid, w in zip(self.ids, self.iw.tolist()):
+            nodes[nid]["initial_weight"] = w
+        return self.data
+
 
-    for node in data["nodes"].values():
-        node["initial_weight"] = aggregate_votes(node.get("votes", {}))
+def enrich_and_save(src: Path, dst: Path) -> Debate:
+    """
+    Read JSON file `src`, add 'initial_weight' to every node,
+    write the enriched file to `dst`, and return the debate.
+    """
+    debate    = Debate.from_json(read_json(src))
+    debate.iw = initial_weights(debate.votes)
 
-    dst.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    return data
+    write_json(dst, debate.to_json())
+    return debate
 
 # ─────────────── Build an interactive tree graph ────────────────
-def build_tree_graph(data: dict, html_path: Path):
+# colour object → white fill, black border, same on hover (shared by all nodes)
+COLOR_OBJ = {
+    "border": "#000000",
+    "background": "#ffffff",
+    "highlight": {"border": "#000000", "background": "#ffffff"},
+    "hover":     {"border": "#000000", "background": "#ffffff"}
+}
+
+GRAPH_OPTIONS = {
+    "layout": {
+        "hierarchical": {
+            "enabled": True,
+            "direction": "DU",
+            "sortMethod": "directed"
+        }
+    },
+    "physics": {"enabled": False},
+    "edges": {"smooth": False},
+    "interaction": {"navigationButtons": True}
+}
+
+# vis-network page (same library pyvis used), filled by plain substitution
+GRAPH_TEMPLATE = """<html>
+    <head>
+        <meta charset="utf-8">
+        <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/dist/vis-network.min.css" crossorigin="anonymous" referrerpolicy="no-referrer" />
+        <script src="https://cdnjs.cloudflare.com/ajax/libs/vis-network/9.1.2/dist/vis-network.min.js" crossorigin="anonymous" referrerpolicy="no-referrer"></script>
+        <style type="text/css">
+             #mynetwork {
+                 width: 100%;
+                 height: 750px;
+                 background-color: #ffffff;
+                 border: 1px solid lightgray;
+                 position: relative;
+                 float: left;
+             }
+        </style>
+    </head>
+    <body>
+        <div id="mynetwork"></div>
+        <script type="text/javascript">
+              var nodes = new vis.DataSet({{NODES_JSON}});
+              var edges = new vis.DataSet({{EDGES_JSON}});
+              var options = {{OPTIONS_JSON}};
+              var network = new vis.Network(document.getElementById("mynetwork"),
+                                            {nodes: nodes, edges: edges}, options);
+        </script>
+    </body>
+</html>
+"""
+
+
+def to_script_json(items) -> str:
+    """JSON for inlining in a <script> block"""
+    return json.dumps(items).replace("</", "<\\/")
+
+
+def build_tree_graph(debate: Debate, html_path: Path):
     """
-    Create a pyvis Network where each node is:
+    Create a vis-network page where each node is:
 
       • a plain white circle with black border
       • label split into two parts:
@@ -103,73 +245,43 @@ def build_tree_graph(data: dict, html_path: Path):
     Edge orientation = Kialo JSON direction (source ▶ successor).
     Saved as HTML without opening a browser.
     """
-    net = Network(height="750px",
-                  width="100%",
-                  directed=True,
-                  bgcolor="#ffffff")
-
-    # 1) Nodes --------------------------------------------------------------
-    for nid, nd in data["nodes"].items():
-        w = nd["initial_weight"]
-
-        # multi-line label: ID on first line, weight on second
-        label = f"{nid}\nw={w:.2f}"
-
-        # colour object → white fill, black border, same on hover
-        color_obj = {
-            "border": "#000000",
-            "background": "#ffffff",
-            "highlight": {"border": "#000000", "background": "#ffffff"},
-            "hover":     {"border": "#000000", "background": "#ffffff"}
+    # 1) Nodes (multi-line label: ID on first line, weight on second) -------
+    json_nodes = debate.data["nodes"]
+    nodes = [
+        {
+            "id": nid,
+            "label": f"{nid}\nw={w:.2f}",
+            "title": f"Node: {nid} | Weight: {w:.3f} | Votes: {json_nodes[nid].get('votes', {})}",  # tooltip with node info
+            "color": COLOR_OBJ,
+            "size": 10 + 30 * w,                      # node size ∝ weight
+            "shape": "circle",
+            "font": {"multi": "html"}                 # allow newline in label
         }
-
-        net.add_node(
-            nid,
-            label=label,
-            title=f"Node: {nid} | Weight: {w:.3f} | Votes: {nd.get('votes', {})}",  # tooltip with node info
-            color=color_obj,
-            size=10 + 30 * w,             # node size ∝ weight
-            shape="circle",
-            font={"multi": "html"}        # allow newline in label
-        )
+        for nid, w in zip(debate.ids, debate.iw.tolist())
+    ]
 
     # 2) Edges --------------------------------------------------------------
-    for src_id, edge in data["edges"].items():
-        dst_id = edge["successor_id"]
-        rel    = edge.get("relation", 0.0)
-        if rel == 0.0:
-            continue
-
-        net.add_edge(
-            src_id, dst_id,
-            color="#d62728" if rel < 0 else "#2ca02c",
-            arrows="to",
-            width=2
-        )
-
-    # 3) Layout -------------------------------------------------------------
-    net.set_options("""
-    var options = {
-      "layout": {
-        "hierarchical": {
-          "enabled": true,
-          "direction": "DU",      
-          "sortMethod": "directed"
+    edges = [
+        {
+            "from": src_id, "to": dst_id,
+            "color": "#d62728" if rel < 0 else "#2ca02c",
+            "arrows": "to",
+            "width": 2
         }
-      },
-      "physics": { "enabled": false },
-      "edges": { "smooth": false },
-      "interaction": { "navigationButtons": true }
-    }
-    """)
-    
+        for src_id, dst_id, rel in zip(debate.edges_src, debate.edges_dst, debate.edges_rel.tolist())
+        if rel != 0.0
+    ]
 
-    # 4) Save HTML ----------------------------------------------------------
-    net.write_html(str(html_path), open_browser=False)
+    # 3) Save HTML ----------------------------------------------------------
+    html = GRAPH_TEMPLATE.replace("{{NODES_JSON}}", to_script_json(nodes)) \
+                         .replace("{{EDGES_JSON}}", to_script_json(edges)) \
+                         .replace("{{OPTIONS_JSON}}", json.dumps(GRAPH_OPTIONS))
+    html_path.write_bytes(html.encode("utf-8"))
 
 
 # ───────────────────────── Pipeline ─────────────────────────
-for src_json in SRC_DIR.glob("*.json"):
+def process_one(src_json: Path) -> str:
+    """Enrich one debate and draw its graph; return the HTML file name."""
     # 1) enrich JSON and save
     enriched_path = DST_DIR / src_json.name
     debate        = enrich_and_save(src_json, enriched_path)
@@ -177,8 +289,15 @@ for src_json in SRC_DIR.glob("*.json"):
     # 2) build HTML graph
     html_file = GRAPH_DIR / f"{src_json.stem}.html"
     build_tree_graph(debate, html_file)
+    return html_file.name
 
-    print(f"✔ {src_json.name:<15} →  {html_file.name}")
 
-print("\n🎉 All done!  Open any .html file inside the 'graphs_initial_weights_added' folder to explore the debates.")
+if __name__ == "__main__":
+    # debates are independent → one process per core, a few chunks per worker
+    src_files = list(SRC_DIR.glob("*.json"))
+    chunksize = max(1, len(src_files) // ((os.cpu_count() or 1) * 4))
+    with ProcessPoolExecutor() as executor:
+        for src_json, html_name in zip(src_files, executor.map(process_one, src_files, chunksize=chunksize)):
+            print(f"✔ {src_json.name:<15} →  {html_name}")
 
+    print("\n🎉 All done!  Open any .html file inside the 'graphs_initial_weights_added' folder to explore the debates.")
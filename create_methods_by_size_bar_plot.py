@@ -3,12 +3,42 @@
 Compute coverage statistics by size category for each method and create bar plot
 """
 
+import argparse
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 import glob
 import os
 
+# Optional: polars scans all CSV files in one multithreaded pass
+try:
+    import polars as pl
+    HAS_POLARS = True
+except ImportError:
+    HAS_POLARS = False
+
+# every CSV and plot goes here; created once in main()
+OUTPUT_DIR = 'debate_size_distribution_plots'
+
+# size_explanation column → column used here, with the type it is converted to
+COLUMN_MAP = {
+    'explanation_type': ('explanation_type', None),
+    'ranking': ('heuristic', None),
+    't_id': ('target_arg', float),
+    'total_graph_args': ('num_args', int),
+    'count_args_returned': ('needed_args', int),
+    'pct_args_of_graph': ('coverage_pct', float),
+}
+
+def compact_dtypes(df):
+    """Store the loaded records in compact columns: int32 counts and a categorical file name.
+
+    Float columns stay float64 so the statistics do not change; explanation_type
+    and heuristic stay strings because the method labels are built by string concatenation.
+    """
+    if df.empty:
+        return df
+    return df.astype({'source_filename': 'category', 'num_args': 'int32', 'needed_args': 'int32'})
+
 def load_and_process_data():
     """Load and process all CSV files from size_explanation directory"""
     print("📁 Loading data files...")
@@ -17,29 +47,32 @@ def load_and_process_data():
     files = glob.glob("size_explanation/*.csv")
     print(f"📊 Found {len(files)} files")
     
-    all_data = []
+    frames = []
     processed_count = 0
     
     for file_path in files:
         try:
-            # Read CSV file
-            df_file = pd.read_csv(file_path)
+            # Read only the needed columns of the CSV file
+            df_file = pd.read_csv(file_path, usecols=lambda c: c in COLUMN_MAP)
             source_filename = os.path.basename(file_path).replace('.csv', '')
             
-            # Process each row
-            for _, row in df_file.iterrows():
-                try:
-                    all_data.append({
-                        'source_filename': source_filename,
-                        'explanation_type': row['explanation_type'],
-                        'heuristic': row['ranking'],
-                        'target_arg': float(row['t_id']),
-                        'num_args': int(row['total_graph_args']),
-                        'needed_args': int(row['count_args_returned']),
-                        'coverage_pct': float(row['pct_args_of_graph'])
-                    })
-                except (ValueError, KeyError) as e:
-                    continue
+            # Rows of a file missing a column cannot be used
+            if len(df_file.columns) == len(COLUMN_MAP):
+                # Convert whole columns, dropping rows whose values do not convert
+                # (numbers that fail to parse, or missing integers)
+                valid = pd.Series(True, index=df_file.index)
+                for column, (_, kind) in COLUMN_MAP.items():
+                    if kind is None:
+                        continue
+                    values = pd.to_numeric(df_file[column], errors='coerce')
+                    valid &= values.notna() | (df_file[column].isna() & (kind is float))
+                    df_file[column] = values
+                df_file = df_file[valid]
+                
+                frame = pd.DataFrame({'source_filename': source_filename}, index=df_file.index)
+                for column, (name, kind) in COLUMN_MAP.items():
+                    frame[name] = df_file[column].astype(kind) if kind is not None else df_file[column]
+                frames.append(frame)
             
             processed_count += 1
             if processed_count % 1000 == 0:
@@ -48,12 +81,62 @@ def load_and_process_data():
         except Exception as e:
             continue
     
-    print(f"✅ Successfully loaded {len(all_data):,} records from {processed_count:,} files")
-    return pd.DataFrame(all_data)
+    df = compact_dtypes(pd.concat(frames, ignore_index=True) if frames else pd.DataFrame())
+    print(f"✅ Successfully loaded {len(df):,} records from {processed_count:,} files")
+    return df
+
+def load_and_process_data_polars():
+    """load_and_process_data with a single polars scan over all CSV files (needs polars).
+
+    Falls back to load_and_process_data when the scan fails, e.g. on a file
+    missing one of the columns (the pandas loader skips such files).
+    """
+    print("📁 Loading data files with polars...")
+    
+    # Find all CSV files
+    files = glob.glob("size_explanation/*.csv")
+    print(f"📊 Found {len(files)} files")
+    # Zero-byte files have no header, the pandas loader skips them too
+    files = [f for f in files if os.path.getsize(f) > 0]
+    if not files:
+        return pd.DataFrame()
+    
+    # Same rule as the pandas path: rows whose numbers do not parse are dropped,
+    # except empty float cells (kept as NaN). The needed columns are read as text,
+    # by name (other columns are ignored), so a value that does not parse can be
+    # told apart from an empty cell
+    columns, valid = [], pl.lit(True)
+    for column, (name, kind) in COLUMN_MAP.items():
+        if kind is None:
+            columns.append(pl.col(column).alias(name))
+            continue
+        values = pl.col(column).cast(pl.Float64, strict=False)
+        valid = valid & (values.is_not_null() | (pl.col(column).is_null() if kind is float else pl.lit(False)))
+        columns.append((values if kind is float else values.cast(pl.Int64)).alias(name))
+    try:
+        df = (
+            pl.scan_csv(files, include_file_paths='source_path', extra_columns='ignore',
+                        schema={column: pl.String for column in COLUMN_MAP})
+            .filter(valid)
+            .select(
+                pl.col('source_path').str.split('/').list.last().str.replace(r'\.csv$', '').alias('source_filename'),
+                *columns
+            )
+            .collect()
+        )
+    except Exception as e:
+        print(f"⚠️ polars could not scan the files ({e}), loading them with pandas")
+        return load_and_process_data()
+    
+    # Back to pandas for the statistics and plots (no pyarrow needed)
+    df = compact_dtypes(pd.DataFrame(df.to_dict(as_series=False)))
+    print(f"✅ Successfully loaded {len(df):,} records from {len(files):,} files")
+    return df
 
-def compute_category_breakpoints_from_data(df):
+def compute_category_breakpoints_from_data(unique_num_args):
     """
-    Compute the actual category breakpoints from the debate size data.
+    Compute the actual category breakpoints from the debate size data
+    (`unique_num_args`: num_args of each debate, counted once).
     This function shows exactly how we derived the values 23, 32, 50, 115.
     
     Returns: dictionary with computed breakpoints and explanation
@@ -61,13 +144,13 @@ def compute_category_breakpoints_from_data(df):
     print("\n🔢 COMPUTING SIZE CATEGORY BREAKPOINTS:")
     print("="*60)
     
-    # Get unique debates (to avoid counting same debate multiple times)
-    unique_debates = df.drop_duplicates(subset=['source_filename'])['num_args']
+    # One value per debate (to avoid counting same debate multiple times)
+    unique_debates = unique_num_args
     
-    # Compute key percentiles from actual data
-    percentiles = {}
-    for p in [50, 60, 70, 75, 80, 87.5, 90]:
-        percentiles[p] = unique_debates.quantile(p/100)
+    # Compute key percentiles from actual data (one sort for all of them)
+    levels = [50, 60, 70, 75, 80, 87.5, 90]
+    percentiles = dict(zip(levels, unique_debates.quantile([p/100 for p in levels]).tolist()))
+    for p in levels:
         print(f"   {p:5.1f}th percentile: {percentiles[p]:6.1f} arguments")
     
     # Define our target breakpoints for balanced distribution
@@ -131,38 +214,47 @@ def compute_category_breakpoints_from_data(df):
         'percentiles_used': percentiles
     }
 
-def assign_size_categories(df):
-    """Assign size categories based on empirical distribution analysis
+def assign_size_categories(df, unique_debates):
+    """Assign size categories to `df` and to its one-row-per-debate view `unique_debates`,
+    based on empirical distribution analysis
     
     Categories derived from actual percentile analysis of 4,326 debates.
     See compute_category_breakpoints_from_data() for exact computation details.
     """
     
     # First, compute and display the actual breakpoints from data
-    breakpoint_info = compute_category_breakpoints_from_data(df)
+    breakpoint_info = compute_category_breakpoints_from_data(unique_debates['num_args'])
     rounded = breakpoint_info['rounded_breakpoints']
     
-    # Use the computed breakpoints for categorization
-    def get_category(num_args):
-        if num_args < rounded['very_small_upper']:           # 50.0% - Very Small (below median)
-            return 'Very Small'
-        elif num_args < rounded['small_upper']:              # 12.5% - Small (50th to 62.5th percentile)
-            return 'Small'
-        elif num_args < rounded['medium_upper']:             # 12.5% - Medium (62.5th to 75th percentile)
-            return 'Medium'
-        elif num_args < rounded['large_upper']:              # 12.5% - Large (75th to 87.5th percentile)
-            return 'Large'
-        else:                                                # 12.5% - Very Large (87.5th+ percentile)
-            return 'Very Large'
-    
-    df['size_category'] = df['num_args'].apply(get_category)
+    # Use the computed breakpoints for categorization: the category index is the
+    # number of breakpoints <= num_args, found for all rows by one binary search
+    #   < very_small_upper → Very Small  (50.0%, below median)
+    #   < small_upper      → Small       (12.5%, 50th to 62.5th percentile)
+    #   < medium_upper     → Medium      (12.5%, 62.5th to 75th percentile)
+    #   < large_upper      → Large       (12.5%, 75th to 87.5th percentile)
+    #   otherwise          → Very Large  (12.5%, 87.5th+ percentile)
+    breakpoints = [rounded['very_small_upper'], rounded['small_upper'],
+                   rounded['medium_upper'], rounded['large_upper']]
+    labels = np.array(['Very Small', 'Small', 'Medium', 'Large', 'Very Large'], dtype=object)
+    
+    df['size_category'] = labels[np.searchsorted(breakpoints, df['num_args'].to_numpy(), side='right')]
+    unique_debates['size_category'] = labels[np.searchsorted(breakpoints, unique_debates['num_args'].to_numpy(), side='right')]
     return df
 
-def create_method_by_size_bar_plot(df):
-    """Create bar plot showing all methods across size categories"""
-    
-    # Create method labels
-    df['method'] = df['explanation_type'] + ' + ' + df['heuristic'].str.replace('_', ' ').str.title()
+def add_method_labels(df):
+    """Add the 'method' column, e.g. 'constructive + Small To Large'
+
+    There are only a handful of heuristics, so each is titled once and mapped onto the rows.
+    """
+    titles = {h: h.replace('_', ' ').title() for h in df['heuristic'].dropna().unique()}
+    df['method'] = df['explanation_type'] + ' + ' + df['heuristic'].map(titles)
+    return df
+
+def create_method_by_size_bar_plot(df, plot=True):
+    """Create bar plot showing all methods across size categories
+
+    The statistics CSV is always written; with plot=False matplotlib is not even imported.
+    """
     
     # Define orders
     method_order = [
@@ -179,6 +271,19 @@ def create_method_by_size_bar_plot(df):
     # Calculate mean coverage by method and size
     stats = df.groupby(['method', 'size_category'])['coverage_pct'].agg(['mean', 'std', 'count']).reset_index()
     
+    # Save detailed statistics to CSV
+    csv_output_path = os.path.join(OUTPUT_DIR, 'methods_by_size_category_statistics.csv')
+    stats.to_csv(csv_output_path, index=False)
+    print(f"💾 Saved statistics CSV: {csv_output_path}")
+    
+    if not plot:
+        return stats
+    
+    # Non-interactive backend, imported only when a plot is wanted
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
     # Create pivot table for easier plotting
     pivot_mean = stats.pivot(index='method', columns='size_category', values='mean')
     pivot_std = stats.pivot(index='method', columns='size_category', values='std')
@@ -187,8 +292,8 @@ def create_method_by_size_bar_plot(df):
     pivot_mean = pivot_mean.reindex(method_order)[size_order]
     pivot_std = pivot_std.reindex(method_order)[size_order]
     
-    # Create the plot with more space
-    fig, ax = plt.subplots(figsize=(18, 12))
+    # Create the plot with more space; constrained layout leaves room for the outside legend
+    fig, ax = plt.subplots(figsize=(18, 12), constrained_layout=True)
     
     # Set up bar positions
     x = np.arange(len(method_order))
@@ -235,31 +340,18 @@ def create_method_by_size_bar_plot(df):
     # Set y-axis limits with more space for labels
     ax.set_ylim(0, 110)
     
-    # Improve layout with custom margins (more space on right for legend)
-    plt.subplots_adjust(top=0.9, bottom=0.15, left=0.08, right=0.85)
-    
     # Save the plot
-    os.makedirs('debate_size_distribution_plots', exist_ok=True)
-    output_path = 'debate_size_distribution_plots/methods_by_size_category_bar_plot.png'
-    plt.savefig(output_path, dpi=300, bbox_inches='tight', pad_inches=0.2)
+    output_path = os.path.join(OUTPUT_DIR, 'methods_by_size_category_bar_plot.png')
+    fig.savefig(output_path, dpi=150)
     print(f"💾 Saved bar plot: {output_path}")
-    
-    # Save detailed statistics to CSV
-    csv_output_path = 'debate_size_distribution_plots/methods_by_size_category_statistics.csv'
-    stats.to_csv(csv_output_path, index=False)
-    print(f"💾 Saved statistics CSV: {csv_output_path}")
-    
-    plt.show()
+    plt.close(fig)
     
     return stats
 
-def compute_debate_size_distribution(df):
-    """Compute and save debate size distribution"""
+def compute_debate_size_distribution(unique_debates):
+    """Compute and save debate size distribution (one row per debate in `unique_debates`)"""
     print("📊 Computing debate size distribution...")
     
-    # Get unique debates by source_filename (to avoid counting same debate multiple times)
-    unique_debates = df.drop_duplicates(subset=['source_filename'])
-    
     # Count debates by size category
     size_distribution = unique_debates['size_category'].value_counts().sort_index()
     
@@ -279,8 +371,7 @@ def compute_debate_size_distribution(df):
     distribution_df = distribution_df.set_index('size_category').reindex(size_order).reset_index()
     
     # Save to CSV
-    os.makedirs('debate_size_distribution_plots', exist_ok=True)
-    dist_csv_path = 'debate_size_distribution_plots/debate_size_distribution.csv'
+    dist_csv_path = os.path.join(OUTPUT_DIR, 'debate_size_distribution.csv')
     distribution_df.to_csv(dist_csv_path, index=False)
     print(f"💾 Saved size distribution: {dist_csv_path}")
     
@@ -301,9 +392,6 @@ def save_detailed_statistics(df):
     """Save comprehensive statistics to CSV"""
     print("💾 Creating detailed statistics CSV...")
     
-    # Create method labels
-    df['method'] = df['explanation_type'] + ' + ' + df['heuristic'].str.replace('_', ' ').str.title()
-    
     # Calculate comprehensive statistics
     detailed_stats = df.groupby(['method', 'size_category'])['coverage_pct'].agg([
         'count', 'mean', 'median', 'std', 'min', 'max',
@@ -318,8 +406,7 @@ def save_detailed_statistics(df):
     detailed_stats = detailed_stats.reset_index()
     
     # Save to CSV
-    os.makedirs('debate_size_distribution_plots', exist_ok=True)
-    detailed_csv_path = 'debate_size_distribution_plots/detailed_statistics_by_method_and_size.csv'
+    detailed_csv_path = os.path.join(OUTPUT_DIR, 'detailed_statistics_by_method_and_size.csv')
     detailed_stats.to_csv(detailed_csv_path, index=False)
     print(f"💾 Saved detailed statistics: {detailed_csv_path}")
     
@@ -327,9 +414,9 @@ def save_detailed_statistics(df):
 
 def print_summary_statistics(stats, df):
     """Print summary statistics"""
-    print("\n" + "="*80)
-    print("📊 SUMMARY STATISTICS BY METHOD AND SIZE CATEGORY")
-    print("="*80)
+    lines = ["\n" + "="*80,
+             "📊 SUMMARY STATISTICS BY METHOD AND SIZE CATEGORY",
+             "="*80]
     
     method_order = [
         'constructive + Small To Large',
@@ -343,7 +430,7 @@ def print_summary_statistics(stats, df):
     size_order = ['Very Small', 'Small', 'Medium', 'Large', 'Very Large']
     
     for method in method_order:
-        print(f"\n🔍 {method.upper()}:")
+        lines.append(f"\n🔍 {method.upper()}:")
         method_data = stats[stats['method'] == method]
         
         for size in size_order:
@@ -352,39 +439,55 @@ def print_summary_statistics(stats, df):
                 mean_val = size_data['mean'].iloc[0]
                 std_val = size_data['std'].iloc[0] 
                 count_val = size_data['count'].iloc[0]
-                print(f"   {size:<12}: {mean_val:6.2f}% ± {std_val:5.2f}% (n={count_val:,})")
+                lines.append(f"   {size:<12}: {mean_val:6.2f}% ± {std_val:5.2f}% (n={count_val:,})")
             else:
-                print(f"   {size:<12}: No data")
+                lines.append(f"   {size:<12}: No data")
+    
+    # one write for the whole table
+    print("\n".join(lines))
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description="Coverage statistics by size category for each method")
+    parser.add_argument("--no-plot", action="store_true", help="Only write the statistics CSVs, skip the bar plot")
+    args = parser.parse_args()
+    
     print("🚀 CREATING BAR PLOT BY SIZE CATEGORIES FOR ALL METHODS")
     print("="*70)
     
-    # Load and process data
-    df = load_and_process_data()
+    # Load and process data (polars when installed, pandas otherwise)
+    df = load_and_process_data_polars() if HAS_POLARS else load_and_process_data()
     
     if df.empty:
         print("❌ No data loaded. Please check your data files.")
         return
     
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    
+    # Unique debates by source_filename (to avoid counting same debate multiple times), deduplicated once
+    unique_debates = df.drop_duplicates(subset=['source_filename'])[['source_filename', 'num_args']]
+    
     # Assign size categories
-    df = assign_size_categories(df)
+    df = assign_size_categories(df, unique_debates)
+    
+    # Method labels, shared by the statistics and the plot
+    df = add_method_labels(df)
     
     # Compute and save debate size distribution
-    size_distribution = compute_debate_size_distribution(df)
+    size_distribution = compute_debate_size_distribution(unique_debates)
     
     # Save detailed statistics
     detailed_stats = save_detailed_statistics(df)
     
-    # Create visualization
-    stats = create_method_by_size_bar_plot(df)
+    # Create visualization (statistics CSV only with --no-plot)
+    stats = create_method_by_size_bar_plot(df, plot=not args.no_plot)
     
     # Print summary
     print_summary_statistics(stats, df)
     
     print("\n✅ ANALYSIS COMPLETED!")
-    print("📁 Check 'debate_size_distribution_plots/methods_by_size_category_bar_plot.png'")
+    if not args.no_plot:
+        print("📁 Check 'debate_size_distribution_plots/methods_by_size_category_bar_plot.png'")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,12 +3,23 @@ from __future__ import annotations
 
 import argparse
 import csv
-import json
 import os
+import re
 import shutil
 import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional, fall back to the stdlib parser
+    from json import loads as json_loads
+
+
+# `<debateid>_T<k>of<n>_<targetid>.json` → targetid
+TARGET_ID_RE = re.compile(r'_T\d+of\d+_([^_/\\]+)\.json$')
+
 
 def extract_target_id_from_filename(fname: str) -> Optional[str]:
     """Extract the target id from filename of form
@@ -17,13 +28,8 @@ def extract_target_id_from_filename(fname: str) -> Optional[str]:
     Returns the target id string (e.g. '1563.2') or None if it cannot be
     parsed.
     """
-    parts = fname.rsplit('_', 1)
-    if len(parts) != 2:
-        return None
-    last = parts[1]
-    if not last.endswith('.json'):
-        return None
-    return last[:-5]
+    m = TARGET_ID_RE.search(fname)
+    return m.group(1) if m else None
 
 
 def find_target_id_in_data(nodes: Dict[str, dict], edges: Dict[str, dict]) -> Optional[str]:
@@ -39,98 +45,112 @@ def find_target_id_in_data(nodes: Dict[str, dict], edges: Dict[str, dict]) -> Op
         return None
     if len(nodes) == 1:
         return next(iter(nodes.keys()))
-    incoming = {nid: 0 for nid in nodes}
-    for src, edge in edges.items():
-        succ = edge.get('successor_id')
-        if succ in incoming:
-            incoming[succ] += 1
-    # return the node with the highest incoming count
-    target = max(incoming.items(), key=lambda kv: kv[1])[0]
-    return target
+    incoming = Counter(edge.get('successor_id') for edge in edges.values())
+    # return the node with the highest incoming count (first in node order on ties)
+    return max(nodes, key=lambda nid: incoming.get(nid, 0))
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """Hard-link dst to src, falling back to a full copy.
+
+    A hard link moves no data, but dst then shares src's inode: the later
+    pipeline steps only read these files, and extract_subdebates replaces its
+    outputs instead of rewriting them in place, so that is fine here. The copy
+    is used when the two folders are on different filesystems (or links are
+    not allowed). Raises shutil.SameFileError, as copy2 does, when dst is src
+    itself (input and output folders are the same).
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        if os.path.samefile(os.path.dirname(src) or '.', os.path.dirname(dst) or '.'):
+            raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+        return  # rerun: dst is already a link to src
+    if os.path.lexists(dst):
+        os.remove(dst)  # rerun: replace the previous output, as copy2 would
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def handle_file(fpath: str, output_folder: str, verbose: bool = False) -> tuple:
+    """Check one sub-debate and copy it to output_folder if its target weight changed.
+
+    Returns the report row (filename, target_id, initial_weight, final_weight, action, reason).
+    """
+    fname = os.path.basename(fpath)
+    try:
+        with open(fpath, 'rb') as f:
+            data = json_loads(f.read())
+    except Exception as e:
+        if verbose:
+            print(f"Error reading {fpath}: {e}")
+        return (fname, None, None, None, 'skipped', f'error_reading:{e}')
+
+    nodes = data.get('nodes', {}) or {}
+    edges = data.get('edges', {}) or {}
+
+    target_id = extract_target_id_from_filename(fname)
+    if target_id is None or target_id not in nodes:
+        inferred = find_target_id_in_data(nodes, edges)
+        if inferred is None:
+            if verbose:
+                print(f"Could not determine target for file {fname}; skipping")
+            return (fname, None, None, None, 'skipped', 'no_target_found')
+        target_id = inferred
+
+    node = nodes.get(target_id)
+    if node is None:
+        if verbose:
+            print(f"Target id {target_id} not found in {fname}; skipping")
+        return (fname, target_id, None, None, 'skipped', 'target_not_in_nodes')
+
+    iw = node.get('initial_weight')
+    fw = node.get('final_weight')
+    if iw is None or fw is None:
+        if verbose:
+            print(f"Skipping {fname}: missing iw/fw for target {target_id}")
+        return (fname, target_id, iw, fw, 'skipped', 'missing_weight')
+
+    if iw == fw:
+        return (fname, target_id, iw, fw, 'skipped', 'no_change')
+
+    outpath = os.path.join(output_folder, fname)
+    try:
+        link_or_copy(fpath, outpath)
+    except Exception as e:
+        if verbose:
+            print(f"Failed to copy {fname}: {e}")
+        return (fname, target_id, iw, fw, 'skipped', f'copy_failed:{e}')
+    if verbose:
+        print(f"Copied {fname} to {output_folder}")
+    return (fname, target_id, iw, fw, 'copied', 'copied')
 
 
 def process_folder(input_folder: str, output_folder: str, verbose: bool = False) -> None:
     """Process all JSON files in input_folder and copy those with weight changes.
 
+    Files are handled by a thread pool (the work is mostly disk I/O).
     Writes a `report.csv` in the output_folder with one row per processed file.
     """
     os.makedirs(output_folder, exist_ok=True)
-    report_rows = []
-    total = 0
-    copied = 0
-
-    for fname in sorted(os.listdir(input_folder)):
-        if not fname.endswith('.json'):
-            continue
-        total += 1
-        fpath = os.path.join(input_folder, fname)
-        try:
-            with open(fpath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception as e:
-            reason = f'error_reading:{e}'
-            report_rows.append((fname, None, None, None, 'skipped', reason))
-            if verbose:
-                print(f"Error reading {fpath}: {e}")
-            continue
-
-        nodes = data.get('nodes', {}) or {}
-        edges = data.get('edges', {}) or {}
-
-        target_id = extract_target_id_from_filename(fname)
-        if target_id is None or target_id not in nodes:
-            inferred = find_target_id_in_data(nodes, edges)
-            if inferred is None:
-                reason = 'no_target_found'
-                report_rows.append((fname, None, None, None, 'skipped', reason))
-                if verbose:
-                    print(f"Could not determine target for file {fname}; skipping")
-                continue
-            target_id = inferred
-
-        node = nodes.get(target_id)
-        if node is None:
-            reason = 'target_not_in_nodes'
-            report_rows.append((fname, target_id, None, None, 'skipped', reason))
-            if verbose:
-                print(f"Target id {target_id} not found in {fname}; skipping")
-            continue
-
-        iw = node.get('initial_weight')
-        fw = node.get('final_weight')
-        if iw is None or fw is None:
-            reason = 'missing_weight'
-            report_rows.append((fname, target_id, iw, fw, 'skipped', reason))
-            if verbose:
-                print(f"Skipping {fname}: missing iw/fw for target {target_id}")
-            continue
-
-        if iw != fw:
-            outpath = os.path.join(output_folder, fname)
-            try:
-                shutil.copy2(fpath, outpath)
-                copied += 1
-                reason = 'copied'
-                report_rows.append((fname, target_id, iw, fw, 'copied', reason))
-                if verbose:
-                    print(f"Copied {fname} to {output_folder}")
-            except Exception as e:
-                reason = f'copy_failed:{e}'
-                report_rows.append((fname, target_id, iw, fw, 'skipped', reason))
-                if verbose:
-                    print(f"Failed to copy {fname}: {e}")
-        else:
-            reason = 'no_change'
-            report_rows.append((fname, target_id, iw, fw, 'skipped', reason))
+
+    # scandir yields the names without a stat per entry
+    with os.scandir(input_folder) as it:
+        paths = [e.path for e in sorted((e for e in it if e.name.endswith('.json')), key=lambda e: e.name)]
+
+    # rows come back in file order
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        report_rows = list(executor.map(lambda fpath: handle_file(fpath, output_folder, verbose), paths))
+    total = len(paths)
+    copied = sum(1 for row in report_rows if row[4] == 'copied')
 
     # write report CSV
     report_path = os.path.join(output_folder, 'report.csv')
     try:
-        with open(report_path, 'w', newline='', encoding='utf-8') as csvf:
+        with open(report_path, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csvf:
             writer = csv.writer(csvf)
             writer.writerow(['filename', 'target_id', 'initial_weight', 'final_weight', 'action', 'reason'])
-            for row in report_rows:
-                writer.writerow(row)
+            writer.writerows(report_rows)
         print(f"Wrote report to {report_path} ({copied}/{total} files copied)")
         # print a short preview
         for i, row in enumerate(report_rows[:50], 1):
@@ -1,12 +1,70 @@
 import os
+import sys
 import json
-from collections import defaultdict
+import argparse
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+try:
+    import orjson  # optional C JSON codec, falls back to the stdlib json
+except ImportError:
+    orjson = None
+
+# parser picked once: orjson, else msgspec (also C, reads bytes), else the stdlib
+if orjson is not None:
+    json_loads = orjson.loads
+else:
+    try:
+        from msgspec.json import decode as json_loads
+    except ImportError:
+        json_loads = json.loads
+
+try:
+    from numba import njit  # optional JIT for the BFS, falls back to pure Python
+except ImportError:
+    njit = None
 
 INPUT_FOLDER = 'kialo_debates_final_weights_added'
 OUTPUT_FOLDER = 'sub-debates'
 
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
+def read_json(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return json_loads(data)
+
+def write_json(path, data):
+    """
+    Indented UTF-8 JSON, written as bytes. The file is written next to path
+    and then renamed over it: a previous output may be hard-linked from
+    debates_with_target_weight_change, and must not be rewritten in place
+    """
+    if orjson is not None:
+        out = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        out = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(out)
+    os.replace(tmp_path, path)
+
+def intern_ids(nodes, edges):
+    """
+    Intern the argument ids (node keys, edge keys, successor ids): equal ids
+    become one object, so the many dict lookups below match on identity
+    """
+    nodes = {sys.intern(nid): nd for nid, nd in nodes.items()}
+    edges = {sys.intern(src): edge for src, edge in edges.items()}
+    for edge in edges.values():
+        succ = edge.get('successor_id')
+        if isinstance(succ, str):
+            edge['successor_id'] = sys.intern(succ)
+    return nodes, edges
+
 def get_targets(debate_id, edges):
     root_id = f"{debate_id}.0"
     neutral_predecessors = [src for src, edge in edges.items()
@@ -15,58 +73,173 @@ def get_targets(debate_id, edges):
         return [root_id]
     return neutral_predecessors
 
-def get_connected_arguments(target_id, edges):
+def build_reverse_index(edges):
+    """successor_id -> list of arguments pointing to it with a non-zero relation"""
+    rev = defaultdict(list)
+    for src, edge in edges.items():
+        if edge.get('relation', 0.0) != 0.0:
+            rev[edge.get('successor_id')].append(src)
+    return rev
+
+def get_connected_arguments(target_id, rev):
     """
     Find all arguments connected to the target by any path (regardless of length).
-    Uses BFS to traverse the graph backwards from the target.
+    Uses BFS to traverse the graph backwards from the target, following the
+    reverse index built by build_reverse_index.
     """
-    connected = set([target_id])
-    queue = [target_id]  # Queue for BFS
+    queue = deque([target_id])  # Queue for BFS
     visited = set([target_id])
     
     while queue:
-        current = queue.pop(0)  # BFS: take from front
+        current = queue.popleft()  # BFS: take from front
         
-        # Find all arguments that point to the current argument
-        for src, edge in edges.items():
-            successor_id = edge.get('successor_id')
-            relation = edge.get('relation', 0.0)
-            
-            # If this edge points to current and has a non-zero relation
-            if successor_id == current and relation != 0.0:
-                if src not in visited:
-                    visited.add(src)
-                    connected.add(src)
-                    queue.append(src)  # Continue searching from this argument
+        # All arguments that point to the current argument with a non-zero relation
+        for src in rev.get(current, ()):
+            if src not in visited:
+                visited.add(src)
+                queue.append(src)  # Continue searching from this argument
     
+    return visited
+
+def get_connected_arguments_all(targets, rev):
+    """
+    get_connected_arguments for every target in one multi-source BFS.
+    Each argument carries the bitmask of the targets it reaches (bit j for
+    targets[j]); an argument is re-queued only when its mask grows.
+    Returns one set of connected arguments per target.
+    """
+    masks = {}
+    for j, target_id in enumerate(targets):
+        masks[target_id] = masks.get(target_id, 0) | (1 << j)
+    queue = deque(masks)
+    queued = set(masks)
+    
+    while queue:
+        current = queue.popleft()
+        queued.discard(current)
+        mask = masks[current]
+        for src in rev.get(current, ()):
+            old = masks.get(src, 0)
+            if old | mask != old:
+                masks[src] = old | mask
+                if src not in queued:
+                    queued.add(src)
+                    queue.append(src)
+    
+    # spread the arguments over their targets' sets
+    connected = [set() for _ in targets]
+    for nid, mask in masks.items():
+        while mask:
+            low = mask & -mask
+            connected[low.bit_length() - 1].add(nid)
+            mask ^= low
     return connected
 
+def build_reverse_csr(rev, extra_ids=()):
+    """
+    The reverse index over integer ids: (ids, index, indptr, indices), the
+    arguments pointing to ids[i] are indices[indptr[i]:indptr[i+1]].
+    extra_ids (e.g. targets nothing points to) get an id too.
+    """
+    index = {n: i for i, n in enumerate(dict.fromkeys(extra_ids))}
+    for succ, srcs in rev.items():
+        for n in [succ] + srcs:
+            if n not in index:
+                index[n] = len(index)
+    indptr = np.zeros(len(index) + 1, dtype=np.int32)
+    for succ, srcs in rev.items():
+        indptr[index[succ] + 1] = len(srcs)
+    np.cumsum(indptr, out=indptr)
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    for succ, srcs in rev.items():
+        i = index[succ]
+        indices[indptr[i]:indptr[i + 1]] = [index[src] for src in srcs]
+    return list(index), index, indptr, indices
+
+if njit is not None:
+    @njit(cache=True)
+    def reach_masks_jit(starts, indptr, indices):
+        """get_connected_arguments_all compiled by numba for up to 64 targets: uint64 target bitmask per id"""
+        n = indptr.shape[0] - 1
+        masks = np.zeros(n, np.uint64)
+        queued = np.zeros(n, np.bool_)
+        queue = np.empty(n, np.int32)  # ring buffer, an id is queued at most once at a time
+        head, count = 0, 0
+        for j in range(starts.shape[0]):
+            masks[starts[j]] |= np.uint64(1) << np.uint64(j)
+            if not queued[starts[j]]:
+                queued[starts[j]] = True
+                queue[(head + count) % n] = starts[j]
+                count += 1
+        while count > 0:
+            current = queue[head]
+            head = (head + 1) % n
+            count -= 1
+            queued[current] = False
+            mask = masks[current]
+            for k in range(indptr[current], indptr[current + 1]):
+                src = indices[k]
+                if masks[src] | mask != masks[src]:
+                    masks[src] |= mask
+                    if not queued[src]:
+                        queued[src] = True
+                        queue[(head + count) % n] = src
+                        count += 1
+        return masks
+
+def connected_arguments_all(targets, rev):
+    """get_connected_arguments_all, through the numba kernel when numba is installed and there are at most 64 targets"""
+    if njit is None or len(targets) > 64:
+        return get_connected_arguments_all(targets, rev)
+    ids, index, indptr, indices = build_reverse_csr(rev, targets)
+    masks = reach_masks_jit(np.array([index[t] for t in targets], dtype=np.int32), indptr, indices)
+    ids = np.array(ids, dtype=object)
+    return [set(ids[(masks >> np.uint64(j)) & np.uint64(1) == 1].tolist()) for j in range(len(targets))]
+
+def process_file(fname, verbose=False):
+    """Write every sub-debate of one debate file; return (files written, log lines to print)"""
+    debate_id = fname.rsplit('.', 1)[0]
+    fpath = os.path.join(INPUT_FOLDER, fname)
+    try:
+        data = read_json(fpath)
+    except Exception as e:
+        return 0, [f"Error reading {fpath}: {e}"]
+    nodes, edges = intern_ids(data.get('nodes', {}), data.get('edges', {}))
+    targets = get_targets(debate_id, edges)
+    rev = build_reverse_index(edges)  # built once, shared by every target
+    connected_sets = connected_arguments_all(targets, rev)  # one pass for all targets
+    edge_pos = {src: i for i, src in enumerate(edges)}  # keeps sub_edges in the debate's edge order
+    n_targets = len(targets)
+    log = []
+    for idx, (target_id, connected) in enumerate(zip(targets, connected_sets), 1):
+        sub_nodes = {nid: nodes[nid] for nid in connected if nid in nodes}
+        # edges are keyed by their source, so only the connected arguments need a look
+        sub_srcs = sorted((src for src in connected if src in edge_pos), key=edge_pos.__getitem__)
+        sub_edges = {src: edges[src] for src in sub_srcs
+                     if edges[src].get('successor_id') in connected}
+        outname = f"{debate_id}_T{idx}of{n_targets}_{target_id}.json"
+        outpath = os.path.join(OUTPUT_FOLDER, outname)
+        write_json(outpath, {'nodes': sub_nodes, 'edges': sub_edges})
+        if verbose:
+            log.append(f"Wrote {outpath}")
+    return n_targets, log
+
 def main():
-    for fname in os.listdir(INPUT_FOLDER):
-        if not fname.endswith('.json'):
-            continue
-        debate_id = fname.rsplit('.', 1)[0]
-        fpath = os.path.join(INPUT_FOLDER, fname)
-        try:
-            with open(fpath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except Exception as e:
-            print(f"Error reading {fpath}: {e}")
-            continue
-        nodes = data.get('nodes', {})
-        edges = data.get('edges', {})
-        targets = get_targets(debate_id, edges)
-        n_targets = len(targets)
-        for idx, target_id in enumerate(targets, 1):
-            connected = get_connected_arguments(target_id, edges)
-            sub_nodes = {nid: nodes[nid] for nid in connected if nid in nodes}
-            sub_edges = {src: edge for src, edge in edges.items()
-                         if src in connected and edge.get('successor_id') in connected}
-            outname = f"{debate_id}_T{idx}of{n_targets}_{target_id}.json"
-            outpath = os.path.join(OUTPUT_FOLDER, outname)
-            with open(outpath, 'w', encoding='utf-8') as outf:
-                json.dump({'nodes': sub_nodes, 'edges': sub_edges}, outf, indent=2, ensure_ascii=False)
-            print(f"Wrote {outpath}")
+    parser = argparse.ArgumentParser(description='Split every debate into one sub-debate per target')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Print every written file')
+    args = parser.parse_args()
+
+    # debates are independent: one worker per file, logs printed in file order
+    # scandir yields the names and file types without a stat per entry
+    with os.scandir(INPUT_FOLDER) as it:
+        fnames = [e.name for e in it if e.name.endswith('.json') and e.is_file()]
+    written = 0
+    with ProcessPoolExecutor() as executor:
+        for n_written, log in executor.map(partial(process_file, verbose=args.verbose), fnames, chunksize=8):
+            written += n_written
+            for line in log:
+                print(line)
+    print(f"Wrote {written} sub-debates to {OUTPUT_FOLDER}")
 
 if __name__ == '__main__':
     main()
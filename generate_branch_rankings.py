@@ -1,13 +1,33 @@
 import os
+import io
+import argparse
 import csv
 import json
-from typing import List, Dict, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache, partial
+from typing import List, Dict, NamedTuple, Tuple
+
+import numpy as np
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional, then msgspec, then the stdlib parser
+    try:
+        from msgspec.json import decode as json_loads
+    except ImportError:
+        from json import loads as json_loads
+
+class Branch(NamedTuple):
+    """One row of a branches CSV"""
+    id: str
+    size: int
+    arguments: List[str]  # root argument first
 
 def load_branch_data_from_csv(csv_path: str) -> Dict:
     """
     Load branch data from CSV file and organize by category.
     """
-    #breakpoint()  # Breakpoint 1: Start of CSV loading
     branches = {
         'Pro-branch': [],
         'Con-branch': [],
@@ -21,31 +41,24 @@ def load_branch_data_from_csv(csv_path: str) -> Dict:
     target_arg = ""
     
     try:
-        with open(csv_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
+        # a few dozen lines per file: the C csv reader is already the fast path
+        with open(csv_path, 'r', encoding='utf-8', newline='') as csvfile:
+            rows = list(csv.reader(csvfile))
+        
+        for row in rows:
+            if len(row) < 4:
+                continue
             
-            for row in reader:
-                if len(row) < 4:
-                    continue
-                
-                # Extract metadata
-                if row[0] == '# Debate File:':
-                    debate_file = row[1]
-                elif row[0] == '# Target Argument:':
-                    target_arg = row[1]
-                elif row[0] in branches:
-                    # Parse branch data
-                    #breakpoint()  # Breakpoint 2: Branch data parsing
-                    branch_type = row[0]
-                    branch_id = row[1]
-                    size = int(row[2])
-                    arguments = row[3].split(',') if row[3] else []
-                    
-                    branches[branch_type].append({
-                        'id': branch_id,
-                        'size': size,
-                        'arguments': arguments
-                    })
+            # Extract metadata
+            if row[0] == '# Debate File:':
+                debate_file = row[1]
+            elif row[0] == '# Target Argument:':
+                target_arg = row[1]
+            else:
+                # Parse branch data (one lookup resolves the category's list)
+                category = branches.get(row[0])
+                if category is not None:
+                    category.append(Branch(row[1], int(row[2]), row[3].split(',') if row[3] else []))
     
     except Exception as e:
         print(f"Error loading CSV {csv_path}: {e}")
@@ -66,6 +79,15 @@ def extract_debate_and_target_ids(filename: str) -> Tuple[str, str]:
     t_id = parts[2]
     return debate_id, t_id
 
+@lru_cache(maxsize=256)
+def load_nodes_cached(debate_path: str) -> Dict:
+    """
+    Nodes of a debate JSON, parsed at most once per path (per worker process).
+    Callers only read the returned dict.
+    """
+    with open(debate_path, 'rb') as file:
+        return json_loads(file.read()).get('nodes', {})
+
 def load_debate_nodes(debate_file: str, debates_folder: str) -> Dict:
     """
     Load node data from the original debate JSON file.
@@ -73,22 +95,20 @@ def load_debate_nodes(debate_file: str, debates_folder: str) -> Dict:
     debate_path = os.path.join(debates_folder, debate_file)
     
     try:
-        with open(debate_path, 'r', encoding='utf-8') as file:
-            debate_data = json.load(file)
-            return debate_data.get('nodes', {})
+        return load_nodes_cached(debate_path)
     except Exception as e:
         print(f"Error loading debate file {debate_path}: {e}")
         return {}
 
-def get_root_final_weight(branch: Dict, nodes: Dict) -> float:
+def get_root_final_weight(branch: Branch, nodes: Dict) -> float:
     """
     Get the final weight of the branch's root argument.
     Assumes the first argument in the branch is the root.
     """
-    if not branch['arguments']:
+    if not branch.arguments:
         return 0.0
     
-    root_id = branch['arguments'][0]  # First argument is the root
+    root_id = branch.arguments[0]  # First argument is the root
     root_node = nodes.get(root_id, {})
     return root_node.get('final_weight', 0.0)
 
@@ -96,7 +116,6 @@ def determine_direction(target_id: str, nodes: Dict) -> str:
     """
     Determine if the target argument is strengthening or weakening.
     """
-    #breakpoint()  # Breakpoint 3: Direction determination
     target_node = nodes.get(target_id, {})
     initial_weight = target_node.get('initial_weight', 0.0)
     final_weight = target_node.get('final_weight', 0.0)
@@ -108,14 +127,13 @@ def determine_direction(target_id: str, nodes: Dict) -> str:
     else:
         return "unchanged"
 
-def apply_heuristics(branches: List[Dict], nodes: Dict) -> Dict:
+def apply_heuristics(branches: List[Branch], nodes: Dict) -> Dict:
     """
     Apply the three heuristics to rank branches:
     - weak to strong: Weakest to strongest (by root final weight)
     - strong to weak: Strongest to weakest (by root final weight)  
     - small to large: Smallest to largest (by number of arguments)
     """
-    #breakpoint()  # Breakpoint 4: Heuristics application
     if not branches:
         return {
             'weak to strong': [],
@@ -123,23 +141,21 @@ def apply_heuristics(branches: List[Dict], nodes: Dict) -> Dict:
             'small to large': []
         }
     
-    # Add final weights to branches for sorting
-    branches_with_weights = []
-    for branch in branches:
-        branch_copy = branch.copy()
-        branch_copy['root_weight'] = get_root_final_weight(branch, nodes)
-        branches_with_weights.append(branch_copy)
+    # root final weights and sizes as arrays (structure of arrays), ranked by
+    # stable argsorts so that ties keep the CSV order as before
+    weights = np.fromiter((get_root_final_weight(branch, nodes) for branch in branches),
+                          dtype=np.float64, count=len(branches))
+    sizes = np.fromiter((branch.size for branch in branches), dtype=np.int64, count=len(branches))
     
     # Heuristic 1: weak to strong (Weakest to Strongest by root final weight)
-    weak_to_strong = sorted(branches_with_weights, key=lambda x: x['root_weight'])
+    weak_to_strong = [branches[i] for i in np.argsort(weights, kind='stable').tolist()]
     
-    # Heuristic 2: strong to weak (Strongest to Weakest by root final weight)
-    strong_to_weak = sorted(branches_with_weights, key=lambda x: x['root_weight'], reverse=True)
+    # Heuristic 2: strong to weak (Strongest to Weakest by root final weight);
+    # sorting -weights, not reversing heuristic 1, keeps tied branches in CSV order
+    strong_to_weak = [branches[i] for i in np.argsort(-weights, kind='stable').tolist()]
     
     # Heuristic 3: small to large (Smallest to Largest by number of arguments)
-    small_to_large = sorted(branches_with_weights, key=lambda x: x['size'])
-    
-    #breakpoint()  # Breakpoint 5: After heuristics sorting
+    small_to_large = [branches[i] for i in np.argsort(sizes, kind='stable').tolist()]
     
     return {
         'weak to strong': weak_to_strong,
@@ -147,17 +163,21 @@ def apply_heuristics(branches: List[Dict], nodes: Dict) -> Dict:
         'small to large': small_to_large
     }
 
-def save_rankings_to_csv(branch_data: Dict, nodes: Dict, debate_id: str, t_id: str, direction: str, output_path: str):
+def list_cell(value: list) -> str:
+    """Compact JSON for a list column (ast.literal_eval reads it too)"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+def save_rankings_to_csv(branch_data: Dict, nodes: Dict, debate_id: str, t_id: str, direction: str, output_path: str,
+                         verbose: bool = False):
     """
     Save branch rankings to CSV file in the specified format.
     """
-    #breakpoint()  # Breakpoint 6: Start of CSV saving
     try:
         with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile, delimiter=',')
             
-            # Write header
-            writer.writerow(['debate_id', 't_id', 'direction', 'heuristic', 'category', 'branches_abv', 'branches', 'ranking_abv', 'ranking'])
+            # Header first; the ranking rows are collected and written in one call
+            rows = [['debate_id', 't_id', 'direction', 'heuristic', 'category', 'branches_abv', 'branches', 'ranking_abv', 'ranking']]
             
             # Map category names to standardized format
             category_mapping = {
@@ -174,92 +194,115 @@ def save_rankings_to_csv(branch_data: Dict, nodes: Dict, debate_id: str, t_id: s
                 if not branches:
                     continue
                 
-                #breakpoint()  # Breakpoint 7: Processing each category
                 standardized_category = category_mapping.get(category, category.lower())
                 
                 # Apply heuristics
                 rankings = apply_heuristics(branches, nodes)
                 
+                # Create branches_abv (original branch IDs before ranking) and
+                # branches (original argument lists before ranking); the same for every heuristic
+                branches_abv_cell = list_cell([branch.id for branch in branches])
+                branches_list_cell = list_cell([branch.arguments for branch in branches])
+                
                 # Write rankings for each heuristic
                 for heuristic, ranked_branches in rankings.items():
                     if not ranked_branches:
                         continue
                     
-                    # Create branches_abv (original branch IDs before ranking)
-                    branches_abv = [branch['id'] for branch in branches]
-                    
-                    # Create branches (original argument lists before ranking)
-                    branches_list = [branch['arguments'] for branch in branches]
-                    
                     # Create ranking_abv (list of branch IDs after ranking)
-                    ranking_abv = [branch['id'] for branch in ranked_branches]
+                    ranking_abv = [branch.id for branch in ranked_branches]
                     
                     # Create ranking (list of argument lists after ranking)
-                    ranking = [branch['arguments'] for branch in ranked_branches]
+                    ranking = [branch.arguments for branch in ranked_branches]
                     
-                    writer.writerow([
+                    rows.append([
                         debate_id,
                         t_id,
                         direction,
                         heuristic,
                         standardized_category,
-                        str(branches_abv),
-                        str(branches_list),
-                        str(ranking_abv),
-                        str(ranking)
+                        branches_abv_cell,
+                        branches_list_cell,
+                        list_cell(ranking_abv),
+                        list_cell(ranking)
                     ])
+            
+            writer.writerows(rows)
         
-        print(f"Saved rankings to: {output_path}")
+        if verbose:
+            print(f"Saved rankings to: {output_path}")
         
     except Exception as e:
         print(f"Error saving rankings CSV {output_path}: {e}")
 
-def process_branch_rankings(branches_folder: str, debates_folder: str, output_folder: str):
+def process_csv_file(csv_file: str, branches_folder: str, debates_folder: str, output_folder: str,
+                     verbose: bool = False) -> str:
     """
-    Process all CSV files in branches folder and generate rankings.
+    Generate the rankings of one branches CSV. Runs in a worker process, so
+    everything it prints is captured and returned for the parent to print.
     """
-    # Create output folder
-    os.makedirs(output_folder, exist_ok=True)
-    
-    # Get all CSV files from branches folder
-    csv_files = [f for f in os.listdir(branches_folder) if f.endswith('.csv')]
-    print(f"Found {len(csv_files)} CSV files in '{branches_folder}'")
-    
-    for csv_file in csv_files:
-        print(f"\nProcessing: {csv_file}")
-        #breakpoint()  # Breakpoint 8: Processing each file
+    log = io.StringIO()
+    with redirect_stdout(log):
+        if verbose:
+            print(f"\nProcessing: {csv_file}")
         
         # Extract debate_id and t_id from filename
         debate_id, t_id = extract_debate_and_target_ids(csv_file)
         
         # Load branch data from CSV
-        csv_path = os.path.join(branches_folder, csv_file)
+        csv_path = f"{branches_folder}/{csv_file}"
         branch_data = load_branch_data_from_csv(csv_path)
         
         if not branch_data:
-            continue
+            return log.getvalue()
         
         # Load corresponding debate nodes
         nodes = load_debate_nodes(branch_data['debate_file'], debates_folder)
         
         if not nodes:
             print(f"Warning: Could not load nodes for {branch_data['debate_file']}")
-            continue
+            return log.getvalue()
         
         # Determine direction based on target argument
         direction = determine_direction(branch_data['target_argument'], nodes)
         
-        #breakpoint()  # Breakpoint 9: Before saving rankings
         # Generate output filename
         output_filename = csv_file.replace('.csv', '_rankings.csv')
-        output_path = os.path.join(output_folder, output_filename)
+        output_path = f"{output_folder}/{output_filename}"  # plain concatenation, "/" works on every OS
         
         # Save rankings
-        save_rankings_to_csv(branch_data, nodes, debate_id, t_id, direction, output_path)
+        save_rankings_to_csv(branch_data, nodes, debate_id, t_id, direction, output_path, verbose)
+    return log.getvalue()
+
+def process_branch_rankings(branches_folder: str, debates_folder: str, output_folder: str, verbose: bool = False):
+    """
+    Process all CSV files in branches folder and generate rankings.
+    Files are independent, so they are spread over a process pool.
+    """
+    # Create output folder
+    os.makedirs(output_folder, exist_ok=True)
+    
+    # Get all CSV files from branches folder
+    # (scandir yields the names and file types without a stat per entry)
+    with os.scandir(branches_folder) as it:
+        csv_files = [e.name for e in it if e.name.endswith('.csv') and e.is_file()]
+    print(f"Found {len(csv_files)} CSV files in '{branches_folder}'")
+    
+    worker = partial(process_csv_file, branches_folder=branches_folder,
+                     debates_folder=debates_folder, output_folder=output_folder, verbose=verbose)
+    with ProcessPoolExecutor() as executor:
+        # logs come back in file order
+        for log in executor.map(worker, csv_files, chunksize=8):
+            print(log, end="")
+    print(f"Rankings saved to '{output_folder}'")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank the branches of every debate with the three heuristics")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Print every processed and saved file")
+    args = parser.parse_args()
+    
     branches_folder = "debate_branches"
     debates_folder = "debates_with_target_weight_change"
     output_folder = "debate_branches_ranking"
     
-    process_branch_rankings(branches_folder, debates_folder, output_folder)
\ No newline at end of file
+    process_branch_rankings(branches_folder, debates_folder, output_folder, verbose=args.verbose)
\ No newline at end of file
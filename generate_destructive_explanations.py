@@ -2,12 +2,28 @@
 
 
 import os
-import csv
+import io
 import json
-import pandas as pd
-import networkx as nx
+import csv
+import ast
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+from itertools import chain, islice
+import numpy as np
 from typing import List, Dict, Tuple
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional, fall back to the stdlib parser
+    from json import loads as json_loads
+
+try:
+    from numba import njit  # optional JIT for the QEM kernel, falls back to pure Python
+except ImportError:
+    njit = None
+
 def load_constructive_explanations_data(csv_path: str) -> Dict:
     """Load constructive explanations data from CSV file."""
     #breakpoint()  # Breakpoint 1: Start of constructive explanations data loading
@@ -35,10 +51,9 @@ def load_constructive_explanations_data(csv_path: str) -> Dict:
                         data['direction'] = direction
                     
                     # Parse constructive explanation data
-                    import ast
                     try:
-                        constructive_abv = ast.literal_eval(constructive_explanation_abv) if constructive_explanation_abv else []
-                        constructive_arg = ast.literal_eval(constructive_explanation_arg) if constructive_explanation_arg else []
+                        constructive_abv = parse_list_cell(constructive_explanation_abv)
+                        constructive_arg = parse_list_cell(constructive_explanation_arg)
                     except (ValueError, SyntaxError) as e:
                         print(f"Error parsing constructive explanations in {csv_path}: {e}")
                         continue
@@ -54,6 +69,26 @@ def load_constructive_explanations_data(csv_path: str) -> Dict:
  
     return data
 
+def parse_list_cell(cell: str) -> list:
+    """
+    A list column of a rankings CSV (JSON as written by generate_branch_rankings.py,
+    or the Python repr used by older files) or of an explanations CSV (JSON, or the
+    Python repr of files written before this change).
+    """
+    if not cell:
+        return []
+    try:
+        return json_loads(cell)
+    except ValueError:
+        pass
+    if '"' not in cell:
+        # with no double quote anywhere, every ' of a repr delimits a string: swapped, it is JSON
+        try:
+            return json_loads(cell.replace("'", '"'))
+        except ValueError:
+            pass
+    return ast.literal_eval(cell)
+
 def load_branch_rankings_data(csv_path: str) -> Dict:
     """Load branch rankings data from CSV file to get all branch categories."""
     #breakpoint()  # Breakpoint 2: Start of branch rankings data loading
@@ -68,6 +103,7 @@ def load_branch_rankings_data(csv_path: str) -> Dict:
         with open(csv_path, 'r', encoding='utf-8') as csvfile:
             reader = csv.reader(csvfile)
             header = next(reader)  # Skip header
+            flat_branches = {}  # branches cell -> (branches, their arguments)
             
             for row in reader:
                 if len(row) >= 9:  # Need all 9 columns
@@ -85,12 +121,16 @@ def load_branch_rankings_data(csv_path: str) -> Dict:
                         data['rankings'][heuristic] = {}
                     
                     # Convert string representations back to lists (safer than eval)
-                    import ast
                     try:
-                        branches_abv_list = ast.literal_eval(branches_abv) if branches_abv else []
-                        branches_list = ast.literal_eval(branches) if branches else []
-                        ranking_abv_list = ast.literal_eval(ranking_abv) if ranking_abv else []
-                        ranking_list = ast.literal_eval(ranking) if ranking else []
+                        branches_abv_list = parse_list_cell(branches_abv)
+                        # a category lists the same branches under every heuristic:
+                        # parse and flatten them once
+                        if branches not in flat_branches:
+                            branches_list = parse_list_cell(branches)
+                            flat_branches[branches] = (branches_list, get_branch_arguments(branches_list))
+                        branches_list, branch_arguments = flat_branches[branches]
+                        ranking_abv_list = parse_list_cell(ranking_abv)
+                        ranking_list = parse_list_cell(ranking)
                     except (ValueError, SyntaxError) as e:
                         print(f"Error parsing lists in {csv_path}: {e}")
                         continue
@@ -98,6 +138,7 @@ def load_branch_rankings_data(csv_path: str) -> Dict:
                     data['rankings'][heuristic][category] = {
                         'branches_abv': branches_abv_list,
                         'branches': branches_list,
+                        'branch_arguments': branch_arguments,  # branches, flattened
                         'ranking_abv': ranking_abv_list,
                         'ranking': ranking_list
                     }
@@ -113,12 +154,59 @@ def load_debate_data(debate_file: str, debates_folder: str) -> Dict:
     debate_path = os.path.join(debates_folder, debate_file)
     
     try:
-        with open(debate_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
+        with open(debate_path, 'rb') as file:
+            return json_loads(file.read())
     except Exception as e:
         print(f"Error loading debate file {debate_path}: {e}")
         return {}
 
+_derived = [None, {}]  # edges dict of the last debate seen, and what was derived from it
+
+def debate_cache(debate_data: Dict) -> Dict:
+    """Structures derived from debate_data, dropped when another debate comes in"""
+    edges = debate_data['edges']
+    if _derived[0] is not edges:
+        _derived[:] = [edges, {}]
+    return _derived[1]
+
+def build_edge_index(debate_data: Dict) -> Dict:
+    """successor_id -> sources of the edges pointing to it, in edge order; built once per debate"""
+    cache = debate_cache(debate_data)
+    if 'incoming' not in cache:
+        index = {}
+        for src_id, edge_data in debate_data['edges'].items():
+            index.setdefault(edge_data.get('successor_id'), []).append(src_id)
+        cache['incoming'] = index
+    return cache['incoming']
+
+def topological_order(children: Dict) -> List[str]:
+    """Kahn's algorithm over node -> children lists (every node is a key); None if there is a cycle"""
+    indeg = dict.fromkeys(children, 0)
+    for kids in children.values():
+        for c in kids:
+            indeg[c] += 1
+    order = []
+    dq = deque(n for n, d in indeg.items() if d == 0)
+    while dq:
+        n = dq.popleft()
+        order.append(n)
+        for c in children[n]:
+            indeg[c] -= 1
+            if indeg[c] == 0:
+                dq.append(c)
+    return order if len(order) == len(indeg) else None
+
+def full_topological_order(debate_data: Dict):
+    """Topological order of the whole debate graph, None if it has a cycle; computed once per debate"""
+    cache = debate_cache(debate_data)
+    if 'topo' not in cache:
+        children = {}
+        for src_id, e in debate_data['edges'].items():
+            children.setdefault(src_id, []).append(e["successor_id"])
+            children.setdefault(e["successor_id"], [])
+        cache['topo'] = topological_order(children)
+    return cache['topo']
+
 def create_restriction(debate_data: Dict, args_subset: List[str]) -> Dict:
     """Create restriction of argumentation framework to subset of arguments."""
     #breakpoint()  # Breakpoint 3: Creating framework restriction
@@ -131,16 +219,22 @@ def create_restriction(debate_data: Dict, args_subset: List[str]) -> Dict:
                        if arg_id in debate_data['nodes']}
     
     # Filter edges - keep only edges between arguments in subset
+    # (only the edges pointing into the subset are looked at)
+    edges, incoming = debate_data['edges'], build_edge_index(debate_data)
+    subset = set(args_subset)
     restricted_edges = {}
-    for src_id, edge_data in debate_data['edges'].items():
-        dst_id = edge_data.get('successor_id')
-        if src_id in args_subset and dst_id in args_subset:
-            restricted_edges[src_id] = edge_data
+    for dst_id in args_subset:
+        for src_id in incoming.get(dst_id, ()):
+            if src_id in subset:
+                restricted_edges[src_id] = edges[src_id]
     
     return {'nodes': restricted_nodes, 'edges': restricted_edges}
 
-def apply_qem_to_restriction(restricted_framework: Dict) -> Dict:
-    """Apply QEM semantics to a restricted framework and return final weights."""
+def apply_qem_to_restriction(restricted_framework: Dict, full_topo: List[str] = None) -> Dict:
+    """
+    Apply QEM semantics to a restricted framework and return final weights.
+    full_topo, the order of full_topological_order, saves sorting the restriction.
+    """
     #breakpoint()  # Breakpoint 4: Applying QEM semantics to restriction
     nodes = restricted_framework['nodes']
     edges = restricted_framework['edges']
@@ -149,14 +243,15 @@ def apply_qem_to_restriction(restricted_framework: Dict) -> Dict:
         return {}
     
     # Initial weights
-    w_init = pd.Series({nid: nd["initial_weight"] for nid, nd in nodes.items()})
+    w_init = {nid: nd["initial_weight"] for nid, nd in nodes.items()}
     
-    # Build support/attack dictionaries and graph
-    sup, att, G = {}, {}, nx.DiGraph()
+    # Build support/attack dictionaries and graph (node -> children)
+    sup, att, children = {}, {}, {}
     
     for src_id, e in edges.items():
         dst_id, rel = e["successor_id"], e.get("relation", 0.0)
-        G.add_edge(src_id, dst_id)
+        children.setdefault(src_id, []).append(dst_id)
+        children.setdefault(dst_id, [])
         
         if rel > 0:
             sup.setdefault(dst_id, []).append(src_id)
@@ -164,16 +259,27 @@ def apply_qem_to_restriction(restricted_framework: Dict) -> Dict:
             att.setdefault(dst_id, []).append(src_id)
     
     # Handle case with no edges (isolated nodes)
-    if not G.edges():
+    if not edges:
         return {nid: w_init[nid] for nid in nodes.keys()}
     
-    try:
-        topo = list(nx.topological_sort(G))
-    except nx.NetworkXUnfeasible:
-        # Handle cycles by using arbitrary order
-        topo = list(nodes.keys())
+    if full_topo is not None:
+        # the debate's order, filtered, is a topological order of any of its restrictions
+        topo = [n for n in full_topo if n in children]
+    else:
+        topo = topological_order(children)
+        if topo is None:
+            # Handle cycles by using arbitrary order
+            topo = list(nodes.keys())
     
     # Apply QEM
+    if njit is not None:
+        index = {n: i for i, n in enumerate(topo)}
+        out = qem_all(np.arange(len(topo), dtype=np.int32),
+                      *build_parent_csr(topo, index, sup), *build_parent_csr(topo, index, att),
+                      np.ones(len(topo), dtype=np.bool_),
+                      np.array([w_init[n] for n in topo], dtype=np.float64), np.zeros(len(topo)))
+        return dict(zip(topo, out.tolist()))
+    
     final_acc = {}
     for n in topo:
         final_acc[n] = qem_accept(n, sup, att, final_acc, w_init)
@@ -190,20 +296,189 @@ def qem_accept(n, sup, att, final_acc, w_init):
     return w0 + (1 - w0) * h(e) if e > 0 else w0 - w0 * h(-e)
 
 def calculate_energy(n, sup, att, final_acc):
-    """Calculate energy for QEM."""
-    return sum(final_acc.get(s, 0) for s in sup.get(n, [])) - \
-           sum(final_acc.get(a, 0) for a in att.get(n, []))
+    """Calculate energy for QEM (plain additions in edge order, as qem_all does)."""
+    e_sup = 0.0
+    for s in sup.get(n, []):
+        e_sup += final_acc.get(s, 0)
+    e_att = 0.0
+    for a in att.get(n, []):
+        e_att += final_acc.get(a, 0)
+    return e_sup - e_att
 
 def h(x):
     """Transformation function for QEM."""
-    return (max(x, 0) ** 2) / (1 + max(x, 0) ** 2)
+    x = max(x, 0)
+    return (x * x) / (1 + x * x)
+
+def build_parent_csr(order, index, parents):
+    """(indptr, idx) as int32 arrays: parents of order[i] are idx[indptr[i]:indptr[i+1]], in edge order"""
+    indptr, idx = [0], []
+    for n in order:
+        idx.extend(index[p] for p in parents.get(n, ()) if p in index)
+        indptr.append(len(idx))
+    return np.array(indptr, dtype=np.int32), np.array(idx, dtype=np.int32)
+
+if njit is not None:
+    @njit(cache=True)
+    def qem_all(topo_order, sup_indptr, sup_idx, att_indptr, att_idx, member, w_init, out):
+        """
+        qem_accept compiled by numba for the integer ids of topo_order, written into out.
+        Only parents flagged in member count, and out holds 0.0 for ids not computed yet,
+        as final_acc.get(s, 0) does. Without parents e is 0 and out[n] is w_init[n].
+        """
+        for n in topo_order:
+            e_sup = 0.0
+            for k in range(sup_indptr[n], sup_indptr[n + 1]):
+                if member[sup_idx[k]]:
+                    e_sup += out[sup_idx[k]]
+            e_att = 0.0
+            for k in range(att_indptr[n], att_indptr[n + 1]):
+                if member[att_idx[k]]:
+                    e_att += out[att_idx[k]]
+            e = e_sup - e_att
+            # h(e) for e > 0 and h(-e) otherwise share e * e (not e ** 2: pow() can round differently)
+            x2 = e * e
+            hv = x2 / (1 + x2)
+            w0 = w_init[n]
+            if e > 0:
+                out[n] = w0 + (1 - w0) * hv
+            else:
+                out[n] = w0 - w0 * hv
+        return out
+
+class IncrementalQEM:
+    """
+    QEM final weights of growing restrictions of one debate.
+
+    The restrictions of an explanation search only ever gain arguments, and an
+    argument's final weight depends only on the arguments that reach it. Edges
+    are keyed by their source, so every argument has at most one successor:
+    adding arguments can only change them and the successor chains they feed
+    into. `add` recomputes just those, in topological order, and keeps
+    the cached weights of every other argument. Supporter/attacker sums run in
+    edge order, as in apply_qem_to_restriction, so the weights are identical.
+
+    target_id, when given, is in every restriction and comes after the added
+    arguments, as in the searches' argument lists: on a debate with a cycle the
+    restriction is recomputed whole, in that order.
+    """
+    
+    def __init__(self, debate_data: Dict, target_id: str = None):
+        self.debate_data = debate_data
+        self.target_id = target_id
+        # what only depends on the debate is shared by all its searches
+        cache = debate_cache(debate_data)
+        if 'qem' not in cache:
+            cache['qem'] = self.debate_structure(debate_data)
+        self.w_init, self.successor, self.sup_in, self.att_in, self.position, self.arrays = cache['qem']
+        self.args = []             # the added arguments, in the order they were added
+        self.members = set()
+        self.final_acc = {}
+        self.member = self.out = None
+        if self.arrays is not None:
+            self.member = np.zeros(len(self.w_init), dtype=np.bool_)
+            self.out = np.zeros(len(self.w_init))
+    
+    @staticmethod
+    def debate_structure(debate_data: Dict) -> Tuple:
+        """(w_init, successor, sup_in, att_in, position, arrays) of the whole debate"""
+        w_init = {nid: nd["initial_weight"] for nid, nd in debate_data['nodes'].items()}
+        successor = {}             # src -> dst over supports and attacks
+        sup_in, att_in = {}, {}    # dst -> sources, in edge order
+        for src_id, e in debate_data['edges'].items():
+            dst_id, rel = e["successor_id"], e.get("relation", 0.0)
+            if rel > 0:
+                sup_in.setdefault(dst_id, []).append(src_id)
+            elif rel < 0:
+                att_in.setdefault(dst_id, []).append(src_id)
+            if rel != 0:
+                successor[src_id] = dst_id
+        topo = full_topological_order(debate_data)
+        # cycles: fall back to full recomputation
+        position = {n: i for i, n in enumerate(topo)} if topo is not None else None
+        arrays = None
+        if njit is not None and position is not None:
+            # the whole debate as arrays for qem_all, restrictions as a member mask
+            index = {n: i for i, n in enumerate(w_init)}
+            arrays = (index, build_parent_csr(index, index, sup_in), build_parent_csr(index, index, att_in),
+                      np.array(list(w_init.values()), dtype=np.float64))
+        return w_init, successor, sup_in, att_in, position, arrays
+    
+    def add(self, new_args: List[str]) -> Dict:
+        """Add new_args to the restriction and return its final weights"""
+        first = not self.args
+        self.args.extend(new_args)
+        if self.position is None:
+            order = self.args if self.target_id is None else self.args + [self.target_id]
+            return apply_qem_to_restriction(create_restriction(self.debate_data, order))
+        if not first:
+            return self.update(new_args)
+        if self.target_id is not None:
+            new_args = list(new_args) + [self.target_id]
+        
+        # the searches of every heuristic over a debate start from the same
+        # arguments: the first one computes their weights, the others copy them
+        starts = debate_cache(self.debate_data).setdefault('starts', {})
+        key = frozenset(new_args)
+        if key not in starts:
+            self.update(new_args)
+            starts[key] = self.copy_state(self.members, self.final_acc, self.member, self.out)
+        self.members, self.final_acc, self.member, self.out = self.copy_state(*starts[key])
+        return self.final_acc
+    
+    @staticmethod
+    def copy_state(members, final_acc, member, out) -> Tuple:
+        """Independent copies of the search state (member and out are None without numba)"""
+        return (set(members), dict(final_acc),
+                None if member is None else member.copy(), None if out is None else out.copy())
+    
+    def update(self, new_args: List[str]) -> Dict:
+        """Weights after adding new_args: only they and their successor chains are recomputed"""
+        added = [a for a in dict.fromkeys(new_args) if a not in self.members and a in self.w_init]
+        self.members.update(added)
+        
+        # added arguments and everything downstream of them inside the restriction
+        dirty = set(added)
+        for a in added:
+            x = self.successor.get(a)
+            while x is not None and x in self.members and x not in dirty:
+                dirty.add(x)
+                x = self.successor.get(x)
+        
+        order = sorted(dirty, key=lambda n: self.position.get(n, -1))
+        if self.arrays is not None:
+            index, sup_csr, att_csr, w0s = self.arrays
+            self.member[[index[a] for a in added]] = True
+            rows = np.array([index[n] for n in order], dtype=np.int32)
+            qem_all(rows, *sup_csr, *att_csr, self.member, w0s, self.out)
+            self.final_acc.update(zip(order, self.out[rows].tolist()))
+            return self.final_acc
+        
+        # qem_accept inlined: parent weights read straight from final_acc
+        final_acc, members = self.final_acc, self.members
+        for n in order:
+            w0 = self.w_init[n]
+            sup = [final_acc[s] for s in self.sup_in.get(n, ()) if s in members]
+            att = [final_acc[a] for a in self.att_in.get(n, ()) if a in members]
+            if not sup and not att:
+                final_acc[n] = w0
+                continue
+            e_sup = 0.0
+            for v in sup:
+                e_sup += v
+            e_att = 0.0
+            for v in att:
+                e_att += v
+            e = e_sup - e_att
+            # h(e) for e > 0 and h(-e) otherwise share e * e (not e ** 2: pow() can round differently)
+            x2 = e * e
+            hv = x2 / (1 + x2)
+            final_acc[n] = w0 + (1 - w0) * hv if e > 0 else w0 - w0 * hv
+        return final_acc
 
 def get_branch_arguments(branches_data: List[List[str]]) -> List[str]:
     """Flatten list of branch argument lists into single list."""
-    all_args = []
-    for branch_args in branches_data:
-        all_args.extend(branch_args)
-    return all_args
+    return list(chain.from_iterable(branches_data))
 
 def generate_destructive_explanation(rankings_data: Dict, debate_data: Dict, heuristic: str) -> Dict:
     """Generate destructive explanation for a specific heuristic."""
@@ -222,6 +497,8 @@ def generate_destructive_explanation(rankings_data: Dict, debate_data: Dict, heu
     
     # Get target's initial weight from original debate (constant across all frameworks)
     w0_target = debate_data['nodes'][target_id]['initial_weight']
+    # frameworks below only grow: weights are updated, not recomputed
+    qem = IncrementalQEM(debate_data)
     
     heuristic_data = rankings_data['rankings'].get(heuristic, {})
     
@@ -235,15 +512,13 @@ def generate_destructive_explanation(rankings_data: Dict, debate_data: Dict, heu
         pro_branches = heuristic_data.get('pro-branches', {})
         
         # Initial framework: ALL unweakened con + ALL con-weakening + target
-        unweakened_con_args = get_branch_arguments(unweakened_con.get('branches', []))
-        con_weakening_args = get_branch_arguments(con_weakening.get('branches', []))
+        unweakened_con_args = unweakened_con.get('branch_arguments', [])
+        con_weakening_args = con_weakening.get('branch_arguments', [])
         base_args = unweakened_con_args + con_weakening_args + [target_id]
         
         # Check if already satisfied with initial framework
         #breakpoint()  # Breakpoint 7: Check initial strengthening condition
-        restriction = create_restriction(debate_data, base_args)
-        final_weights = apply_qem_to_restriction(restriction)
-        w1_target = final_weights.get(target_id, w0_target)
+        w1_target = qem.add(base_args).get(target_id, w0_target)
         
         if w1_target > w0_target:
             # Already satisfied with just the base framework
@@ -276,10 +551,7 @@ def generate_destructive_explanation(rankings_data: Dict, debate_data: Dict, heu
             
             # Test current framework: base + added pro-branches
             #breakpoint()  # Breakpoint 9: Check pro-branch addition effect
-            current_args = base_args + added_pro_args
-            restriction = create_restriction(debate_data, current_args)
-            final_weights = apply_qem_to_restriction(restriction)
-            w1_target = final_weights.get(target_id, w0_target)
+            w1_target = qem.add(pro_branch_args).get(target_id, w0_target)
             
             if w1_target > w0_target:
                 # Found minimal destructive explanation
@@ -307,15 +579,13 @@ def generate_destructive_explanation(rankings_data: Dict, debate_data: Dict, heu
         con_branches = heuristic_data.get('con-branches', {})
         
         # Initial framework: ALL unweakened pro + ALL pro-weakening + target
-        unweakened_pro_args = get_branch_arguments(unweakened_pro.get('branches', []))
-        pro_weakening_args = get_branch_arguments(pro_weakening.get('branches', []))
+        unweakened_pro_args = unweakened_pro.get('branch_arguments', [])
+        pro_weakening_args = pro_weakening.get('branch_arguments', [])
         base_args = unweakened_pro_args + pro_weakening_args + [target_id]
         
         # Check if already satisfied with initial framework
         #breakpoint()  # Breakpoint 11: Check initial weakening condition
-        restriction = create_restriction(debate_data, base_args)
-        final_weights = apply_qem_to_restriction(restriction)
-        w1_target = final_weights.get(target_id, w0_target)
+        w1_target = qem.add(base_args).get(target_id, w0_target)
         
         if w1_target < w0_target:
             # Already satisfied with just the base framework
@@ -348,10 +618,7 @@ def generate_destructive_explanation(rankings_data: Dict, debate_data: Dict, heu
             
             # Test current framework: base + added con-branches
             #breakpoint()  # Breakpoint 13: Check con-branch addition effect
-            current_args = base_args + added_con_args
-            restriction = create_restriction(debate_data, current_args)
-            final_weights = apply_qem_to_restriction(restriction)
-            w1_target = final_weights.get(target_id, w0_target)
+            w1_target = qem.add(con_branch_args).get(target_id, w0_target)
             
             if w1_target < w0_target:
                 # Found minimal destructive explanation
@@ -377,54 +644,56 @@ def generate_destructive_explanation(rankings_data: Dict, debate_data: Dict, heu
         'destructive_explanation_arg': []
     }
 
+def list_cell(value: list) -> str:
+    """Compact JSON for a list column (ast.literal_eval reads it too)"""
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
 def save_combined_explanations_csv(constructive_data: Dict, heuristic_explanations: Dict, output_path: str):
     """Save CSV with both constructive and destructive explanations."""
     #breakpoint()  # Breakpoint 15: Start saving combined CSV output
     try:
+        # Header with both constructive and destructive columns, then one row per heuristic
+        rows = [[
+            'debate_id', 't_id', 'direction', 'heuristic', 
+            'constructive_explanation_abv', 'constructive_explanation_arg',
+            'destructive_explanation_abv', 'destructive_explanation_arg'
+        ]]
+        for heuristic in ['weak to strong', 'strong to weak', 'small to large']:
+            if heuristic in constructive_data['explanations']:
+                constructive_exp = constructive_data['explanations'][heuristic]
+                destructive_exp = heuristic_explanations.get(heuristic, {
+                    'destructive_explanation_abv': [],
+                    'destructive_explanation_arg': []
+                })
+                
+                rows.append([
+                    constructive_data['debate_id'],
+                    constructive_data['t_id'], 
+                    constructive_data['direction'],
+                    heuristic,
+                    list_cell(constructive_exp['constructive_explanation_abv']),
+                    list_cell(constructive_exp['constructive_explanation_arg']),
+                    list_cell(destructive_exp['destructive_explanation_abv']),
+                    list_cell(destructive_exp['destructive_explanation_arg'])
+                ])
+        
+        # rows are built first, then written in one call
         with open(output_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            
-            # Write header with both constructive and destructive columns
-            writer.writerow([
-                'debate_id', 't_id', 'direction', 'heuristic', 
-                'constructive_explanation_abv', 'constructive_explanation_arg',
-                'destructive_explanation_abv', 'destructive_explanation_arg'
-            ])
-            
-            # Write one row per heuristic
-            for heuristic in ['weak to strong', 'strong to weak', 'small to large']:
-                if heuristic in constructive_data['explanations']:
-                    constructive_exp = constructive_data['explanations'][heuristic]
-                    destructive_exp = heuristic_explanations.get(heuristic, {
-                        'destructive_explanation_abv': [],
-                        'destructive_explanation_arg': []
-                    })
-                    
-                    writer.writerow([
-                        constructive_data['debate_id'],
-                        constructive_data['t_id'], 
-                        constructive_data['direction'],
-                        heuristic,
-                        str(constructive_exp['constructive_explanation_abv']),
-                        str(constructive_exp['constructive_explanation_arg']),
-                        str(destructive_exp['destructive_explanation_abv']),
-                        str(destructive_exp['destructive_explanation_arg'])
-                    ])
+            csv.writer(csvfile).writerows(rows)
         
         # Silent success - only print failures
         
     except Exception as e:
         print(f"Error saving combined explanations CSV {output_path}: {e}")
 
-def process_destructive_explanations(constructive_folder: str, rankings_folder: str, debates_folder: str, output_folder: str):
-    """Process all constructive explanation files and add destructive explanations."""
-    #breakpoint()  # Breakpoint 16: Start of main processing function
-    os.makedirs(output_folder, exist_ok=True)
-    
-    csv_files = [f for f in os.listdir(constructive_folder) if f.endswith('_constructive_explanations.csv')]
-    print(f"Processing {len(csv_files)} constructive explanation CSV files from '{constructive_folder}'")
-    
-    for csv_file in csv_files:
+def process_one_csv(csv_file: str, constructive_folder: str, rankings_folder: str, debates_folder: str,
+                    output_folder: str) -> Tuple[str, bool]:
+    """
+    Add the destructive explanations of one constructive explanations CSV. Runs in
+    a worker process: returns what it printed, and whether execution has to stop.
+    """
+    log = io.StringIO()
+    with redirect_stdout(log):
         #breakpoint()  # Breakpoint 17: Processing each CSV file
         # Load constructive explanations data
         csv_path = os.path.join(constructive_folder, csv_file)
@@ -432,10 +701,10 @@ def process_destructive_explanations(constructive_folder: str, rankings_folder:
         
         if not constructive_data['debate_id']:
             print(f"ERROR: {csv_file} - missing debate_id")
-            continue
+            return log.getvalue(), False
         if not constructive_data:
             print(f"ERROR: {csv_file} - No constructive data")
-            continue
+            return log.getvalue(), False
         
         # Load corresponding rankings data for branch information
         rankings_file = csv_file.replace('_constructive_explanations.csv', '_rankings.csv')
@@ -446,13 +715,13 @@ def process_destructive_explanations(constructive_folder: str, rankings_folder:
             print(f"Expected rankings file: {rankings_file}")
             print(f"Rankings path: {rankings_path}")
             print("STOPPING EXECUTION to verify rankings file matching logic")
-            exit(1)
+            return log.getvalue(), True
             
         rankings_data = load_branch_rankings_data(rankings_path)
         
         if not rankings_data:
             print(f"ERROR: {csv_file} - Could not load rankings data from {rankings_file}")
-            continue
+            return log.getvalue(), False
         
         # Find the correct debate filename
         debate_id = constructive_data['debate_id']
@@ -503,13 +772,13 @@ def process_destructive_explanations(constructive_folder: str, rankings_folder:
             print(f"Constructive CSV filename: {csv_file}")
             print(f"CSV filename parts: {csv_filename.replace('_branches_', '_').split('_')[0:3] if 'csv_filename' in locals() else 'N/A'}")
             print("STOPPING EXECUTION to verify filename matching logic")
-            exit(1)
+            return log.getvalue(), True
             
         debate_data = load_debate_data(debate_filename, debates_folder)
         
         if not debate_data:
             print(f"ERROR: {csv_file} - Could not load debate data for {debate_filename}")
-            continue
+            return log.getvalue(), False
         
         # Generate destructive explanations for each heuristic
         heuristics = ['weak to strong', 'strong to weak', 'small to large']
@@ -528,6 +797,34 @@ def process_destructive_explanations(constructive_folder: str, rankings_folder:
         output_filename = csv_file.replace('_constructive_explanations.csv', '_combined_explanations.csv')
         output_path = os.path.join(output_folder, output_filename)
         save_combined_explanations_csv(constructive_data, heuristic_explanations, output_path)
+    return log.getvalue(), False
+
+def process_destructive_explanations(constructive_folder: str, rankings_folder: str, debates_folder: str, output_folder: str):
+    """
+    Process all constructive explanation files and add destructive explanations.
+    Files are independent, so they are spread over a process pool.
+    """
+    #breakpoint()  # Breakpoint 16: Start of main processing function
+    os.makedirs(output_folder, exist_ok=True)
+    
+    csv_files = [f for f in os.listdir(constructive_folder) if f.endswith('_constructive_explanations.csv')]
+    print(f"Processing {len(csv_files)} constructive explanation CSV files from '{constructive_folder}'")
+    
+    worker = partial(process_one_csv, constructive_folder=constructive_folder, rankings_folder=rankings_folder,
+                     debates_folder=debates_folder, output_folder=output_folder)
+    files = iter(csv_files)
+    with ProcessPoolExecutor() as executor:
+        # files are submitted a few at a time and their logs read in file order,
+        # so a stop leaves the files after the window unprocessed
+        pending = deque(executor.submit(worker, f) for f in islice(files, (os.cpu_count() or 1) * 2))
+        while pending:
+            log, stop = pending.popleft().result()
+            print(log, end="")
+            if stop:
+                executor.shutdown(wait=False, cancel_futures=True)
+                exit(1)
+            for csv_file in islice(files, 1):
+                pending.append(executor.submit(worker, csv_file))
 
 if __name__ == "__main__":
     constructive_folder = "constructive_explanations"
@@ -4,9 +4,13 @@
 import os
 import csv
 import ast
-import json
 from typing import Dict, List, Tuple
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # orjson is optional, fall back to the stdlib parser
+    from json import loads as json_loads
+
 def load_debate_data(debate_file: str, debates_folder: str) -> Dict:
     """
     Load debate JSON data to get total argument count.
@@ -24,8 +28,8 @@ def load_debate_data(debate_file: str, debates_folder: str) -> Dict:
     #breakpoint()  # Debug: Verify debate_path is correct
     
     try:
-        with open(debate_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+        with open(debate_path, 'rb') as file:
+            data = json_loads(file.read())
             
         # BREAKPOINT 2: Inspect loaded debate data structure
         #breakpoint()  # Debug: Examine keys, argument count, structure
@@ -35,6 +39,26 @@ def load_debate_data(debate_file: str, debates_folder: str) -> Dict:
         print(f"Error loading debate file {debate_path}: {e}")
         return {}
 
+def parse_list_cell(cell: str) -> list:
+    """
+    A list column of a rankings CSV (JSON as written by generate_branch_rankings.py,
+    or the Python repr used by older files) or of an explanations CSV (JSON, or the
+    Python repr of files written before this change).
+    """
+    if not cell:
+        return []
+    try:
+        return json_loads(cell)
+    except ValueError:
+        pass
+    if '"' not in cell:
+        # with no double quote anywhere, every ' of a repr delimits a string: swapped, it is JSON
+        try:
+            return json_loads(cell.replace("'", '"'))
+        except ValueError:
+            pass
+    return ast.literal_eval(cell)
+
 def load_branch_rankings_data(rankings_path: str) -> Dict:
     """
     Load branch rankings data to get total branch counts by category.
@@ -84,8 +108,8 @@ def load_branch_rankings_data(rankings_path: str) -> Dict:
                     
                     # Parse branch data safely
                     try:
-                        branches_abv_list = ast.literal_eval(branches_abv) if branches_abv else []
-                        branches_list = ast.literal_eval(branches) if branches else []
+                        branches_abv_list = parse_list_cell(branches_abv)
+                        branches_list = parse_list_cell(branches)
                         
                         data['rankings'][heuristic][category] = {
                             'branches_abv': branches_abv_list,
@@ -110,7 +134,7 @@ def count_arguments_in_explanation(explanation_arg: str) -> int:
     represents arguments from different branch categories.
     
     Args:
-        explanation_arg: String representation of nested list of arguments
+        explanation_arg: Nested list of arguments, as JSON (Python repr in older files)
     
     Returns:
         Total count of unique arguments in the explanation
@@ -120,7 +144,7 @@ def count_arguments_in_explanation(explanation_arg: str) -> int:
         #breakpoint()  # Debug: Check format and content of explanation_arg
         
         # Parse the string representation of the nested list
-        arg_lists = ast.literal_eval(explanation_arg) if explanation_arg else []
+        arg_lists = parse_list_cell(explanation_arg)
         
         # BREAKPOINT 4: Examine parsed argument lists structure
         #breakpoint()  # Debug: Verify parsing worked, check nested structure
@@ -148,7 +172,7 @@ def count_branches_in_explanation(explanation_abv: str, relevant_categories: Lis
     from categories that are relevant for the current explanation type.
     
     Args:
-        explanation_abv: String representation of list of branch category lists
+        explanation_abv: List of branch category lists, as JSON (Python repr in older files)
         relevant_categories: List of category indices to count (e.g., [1, 2] for positions 1 and 2)
     
     Returns:
@@ -159,7 +183,7 @@ def count_branches_in_explanation(explanation_abv: str, relevant_categories: Lis
         #breakpoint()  # Debug: Inspect explanation_abv format and relevant_categories
         
         # Parse the string representation of the list
-        branch_lists = ast.literal_eval(explanation_abv) if explanation_abv else []
+        branch_lists = parse_list_cell(explanation_abv)
         
         # BREAKPOINT 7: Examine parsed branch lists structure
         #breakpoint()  # Debug: Check branch_lists structure and length